@@ -68,7 +68,9 @@ class CADAnalysisMCPServer:
             # Get all spaces on the floor
             spaces_query = """
             MATCH (f:Floor {uid: $floor_uid})-[:HAS_SPACE]->(s:Space)
-            RETURN s.uid AS uid, s.raw_points AS points, s.layer AS layer
+            RETURN s.uid AS uid,
+                   [i IN range(0, coalesce(size(s.raw_points_xs), 0) - 1) | [s.raw_points_xs[i], s.raw_points_ys[i]]] AS points,
+                   s.layer AS layer
             """
             spaces = list(session.run(spaces_query, floor_uid=floor_uid))
             
@@ -185,11 +187,11 @@ class CADAnalysisMCPServer:
             OPTIONAL MATCH (f)-[:HAS_ANNOTATION]->(a:Annotation)
             WHERE distance(
                 point({x: a.insert_x, y: a.insert_y}),
-                point({x: s.raw_points[0][0], y: s.raw_points[0][1]})
+                point({x: s.raw_points_xs[0], y: s.raw_points_ys[0]})
             ) < 1000
             WITH s, collect(a.text) AS nearby_annotations
             RETURN s.uid AS uid, 
-                   s.raw_points AS points,
+                   [i IN range(0, coalesce(size(s.raw_points_xs), 0) - 1) | [s.raw_points_xs[i], s.raw_points_ys[i]]] AS points,
                    s.layer AS layer,
                    nearby_annotations
             """
@@ -608,7 +610,7 @@ class CADAnalysisMCPServer:
         """Check for invalid geometry definitions"""
         query = """
         MATCH (:Building {uid: $building_uid})-[*]->(s:Space)
-        WHERE size(s.raw_points) < 3
+        WHERE coalesce(size(s.raw_points_xs), 0) < 3
         RETURN count(s) AS invalid_spaces
         """
         result = session.run(query, building_uid=building_uid).single()
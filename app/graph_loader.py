@@ -3,12 +3,81 @@
 Enhanced to support OCR text nodes and correlation relationships.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable, Iterator
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import atexit
+import decimal
+import gc
+import itertools
 import json
+import logging
+import mmap
 import os
+import random
+import re
+import tempfile
+import threading
+import time
+import traceback
 from pathlib import Path
+import numpy as np
 # Import Neo4j driver and check for Rust extensions
 from neo4j import GraphDatabase, Driver
+from neo4j.exceptions import TransientError, ServiceUnavailable, AuthError
+
+from libredwg_transformer import LibreDWGTransformer, TransformationConfig
+
+logger = logging.getLogger(__name__)
+
+# orjson parses/serializes in Rust and reads bytes directly; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# psutil is optional: without it memory checks fall back to a plain GC
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Parse JSON bytes, preferring orjson and tolerating invalid UTF-8."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects invalid UTF-8; fall through to the lossy decode below
+            pass
+    return json.loads(raw.decode('utf-8', errors='replace'))
+
+
+def _json_load_file(path: Path) -> Any:
+    """Parse a JSON file through a read-only memory map instead of a bytes copy.
+
+    orjson reads the mapped pages directly, so peak memory during the parse is
+    the parsed objects plus page cache rather than an extra file-sized buffer.
+    """
+    if orjson is not None and path.stat().st_size > 0:
+        try:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        except orjson.JSONDecodeError:
+            # Invalid UTF-8 and friends: let _json_loads do its lossy decode
+            pass
+    return _json_loads(path.read_bytes())
+
+
+def _json_dumps(value: Any) -> str:
+    """Serialize a value to a JSON string for storage as a Neo4j property."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value)
 
 # Check if Rust extensions are available by looking for compiled .so files
 def _check_rust_extensions():
@@ -62,7 +131,11 @@ class Neo4jDriverManager:
         return {
             "uri": os.getenv("NEO4J_URI", "neo4j://localhost:7687"),  # Updated from bolt://
             "user": os.getenv("NEO4J_USER", "neo4j"),
-            "password": os.getenv("NEO4J_PASSWORD", "neo4j")
+            "password": os.getenv("NEO4J_PASSWORD", "neo4j"),
+            # Pool tuning: large ingests want more writers, tiny deployments fewer
+            "pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "100")),
+            "acq_timeout": int(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60")),
+            "max_lifetime": int(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", str(30 * 60)))
         }
     
     @classmethod
@@ -74,15 +147,19 @@ class Neo4jDriverManager:
         
         print(f"[NEO4J_DRIVER] Creating optimized driver: {uri}")
         print(f"[NEO4J_DRIVER] Rust extensions: {'✅ Available' if RUST_DRIVER_AVAILABLE else '❌ Not available'}")
+        print(f"[NEO4J_DRIVER] Pool size: {config['pool_size']}, acquisition timeout: {config['acq_timeout']}s, "
+              f"max lifetime: {config['max_lifetime']}s")
         
         # Performance optimizations based on official Neo4j documentation
         return GraphDatabase.driver(
             uri,
             auth=(user, password),
             # Connection pool optimizations (Neo4j best practices)
-            max_connection_lifetime=30 * 60,      # 30 minutes
-            max_connection_pool_size=100,         # Larger pool for better throughput
-            connection_acquisition_timeout=60,    # Avoid deadlocks
+            max_connection_lifetime=config["max_lifetime"],        # NEO4J_MAX_CONNECTION_LIFETIME (default 30 min)
+            max_connection_pool_size=config["pool_size"],          # NEO4J_MAX_POOL_SIZE (default 100)
+            connection_acquisition_timeout=config["acq_timeout"],  # Avoid deadlocks
+            connection_timeout=15,                # Fail fast on unreachable server
+            keep_alive=True,                      # TCP keep-alive on pooled connections
             # Database targeting for performance gain
             database="neo4j"
         )
@@ -98,10 +175,30 @@ class Neo4jDriverManager:
 
 
 def _get_neo4j_driver() -> Driver:
-    """Get optimized Neo4j driver instance (maintains backward compatibility)."""
+    """Get optimized Neo4j driver instance (maintains backward compatibility).
+    
+    The driver is shared and long-lived: callers must not close it.
+    """
     return Neo4jDriverManager.get_driver()
 
 
+# The shared driver lives for the whole process and is closed once at exit
+atexit.register(Neo4jDriverManager.close_driver)
+
+
+# Caps concurrent write sessions below the pool size so parallel writers queue
+# here instead of stalling on connection_acquisition_timeout
+_WRITE_SEM = threading.BoundedSemaphore(int(os.getenv("NEO4J_WRITE_CONCURRENCY", "16")))
+
+
+@contextmanager
+def writer_slot():
+    """Acquire a write slot and yield a session on the shared driver."""
+    with _WRITE_SEM:
+        with _get_neo4j_driver().session(database="neo4j") as session:
+            yield session
+
+
 # ---------------------------------------------------------------------------
 # Transformation phase (E  ->  intermediate graph representation)
 # ---------------------------------------------------------------------------
@@ -110,6 +207,49 @@ Node = Dict[str, Any]
 Relationship = Dict[str, Any]
 GraphPayload = Dict[str, List[Dict[str, Any]]]
 
+# Files above this size are transformed with the streaming path
+STREAMING_THRESHOLD_BYTES = 50 * 1024 * 1024
+
+# Upper bound on parallel node writers in load_to_neo4j
+NODE_LOAD_MAX_WORKERS = 8
+
+# Relationships are binned by end node into this many parallel writers
+RELATIONSHIP_LOAD_BINS = 8
+
+# Below this size json_chunks_generator parses the whole file at once instead of via ijson
+IN_MEMORY_PARSE_THRESHOLD_BYTES = 200 * 1024 * 1024
+
+# Map numeric DWG types to string names
+DWG_TYPE_MAP = {
+    1: "TEXT",
+    2: "ATTRIB",
+    3: "ATTDEF",
+    4: "BLOCK",
+    7: "INSERT",
+    11: "VERTEX_2D",
+    19: "POLYLINE_2D",
+    20: "POLYLINE_3D",
+    21: "ARC",
+    22: "CIRCLE",
+    23: "LINE",
+    44: "MTEXT",
+    77: "LWPOLYLINE"
+}
+
+# Streaming samples memory pressure once every N chunks (first chunk included)
+MEMORY_CHECK_INTERVAL_CHUNKS = 8
+
+# Neo4j loaders sample memory pressure once every N write batches (first batch included)
+MEMORY_CHECK_INTERVAL_BATCHES = 10
+
+# Per-batch load telemetry goes to DEBUG; an INFO progress line is logged every N batches
+PROGRESS_LOG_INTERVAL_BATCHES = 100
+
+# Opt-in: identical Feature/Annotation entities become one node with a ``copies``
+# count (both transform paths). Off by default, so every entity keeps its own node
+COLLAPSE_DUPLICATE_ENTITIES = os.getenv("GRAPH_COLLAPSE_DUPLICATES", "0") == "1"
+_COLLAPSIBLE_LABELS = frozenset(("Feature", "Annotation"))
+
 
 def _new_uid(prefix: str, counter: int) -> str:
     """Generate a deterministic UID with prefix and counter."""
@@ -117,6 +257,60 @@ def _new_uid(prefix: str, counter: int) -> str:
     return f"{prefix}_{counter}"
 
 
+# Coordinate key sets, compared against dict key views in one C-level set operation
+_XY = frozenset(('x', 'y'))
+_XYZ = frozenset(('x', 'y', 'z'))
+
+
+def _put_point(node: Node, key: str, value: Any) -> None:
+    """Store an ``{x, y, z}`` coordinate on ``node`` as flat ``key_x``/``key_y``/``key_z``.
+    
+    Emitting the flat form at transform time means the loader does not have to
+    re-detect coordinate dicts on every write. Anything else is stored as-is
+    under ``key`` and left to the loader's generic sanitization.
+    """
+    if isinstance(value, dict) and _XYZ <= value.keys():
+        node[f"{key}_x"] = value['x']
+        node[f"{key}_y"] = value['y']
+        node[f"{key}_z"] = value['z']
+    else:
+        node[key] = value
+
+
+def _coordinate_columns(points: List[Any]) -> Optional[Dict[str, List[float]]]:
+    """Split a list of ``{x, y[, z]}`` dicts into per-axis float lists.
+    
+    Returns None when the points are not homogeneous numeric coordinates, in
+    which case the caller keeps the JSON-string fallback.
+    """
+    keys = points[0].keys()
+    if keys != _XY and keys != _XYZ:
+        return None
+    for point in points:
+        if not isinstance(point, dict) or point.keys() != keys:
+            return None
+    try:
+        return {axis: [float(point[axis]) for point in points] for axis in sorted(keys)}
+    except (TypeError, ValueError):
+        return None
+
+
+def _put_points(node: Node, key: str, points: Any) -> None:
+    """Store a point list on ``node`` as native per-axis float lists ``key_xs``/``key_ys``/``key_zs``.
+    
+    Lists that are not homogeneous coordinate dicts are stored as-is under ``key``
+    (the loader turns those into a JSON string).
+    """
+    columns = None
+    if isinstance(points, list) and points and isinstance(points[0], dict):
+        columns = _coordinate_columns(points)
+    if columns is None:
+        node[key] = points
+    else:
+        for axis, column in columns.items():
+            node[f"{key}_{axis}s"] = column
+
+
 def json_chunks_generator(json_file: Path, chunk_size: int = 5000):
     """Generator that yields chunks of entities from JSON file using TRUE streaming.
     
@@ -130,6 +324,24 @@ def json_chunks_generator(json_file: Path, chunk_size: int = 5000):
     print(f"[STREAMING] Starting TRUE streaming for {json_file.name}")
     print(f"[STREAMING] Chunk size: {chunk_size}")
     
+    # Files that fit comfortably in RAM parse much faster in one shot than
+    # through ijson's per-token tokenizer
+    file_size = json_file.stat().st_size
+    if file_size < IN_MEMORY_PARSE_THRESHOLD_BYTES:
+        print(f"[STREAMING] File is {file_size / (1024 * 1024):.1f}MB - parsing in memory")
+        data = _json_load_file(json_file)
+        # Same contract as the ijson path: dict items of a root-level array only
+        entities = [entity for entity in data if isinstance(entity, dict)] if isinstance(data, list) else []
+        del data
+        
+        for start in range(0, len(entities), chunk_size):
+            chunk = entities[start:start + chunk_size]
+            print(f"[STREAMING] ✅ In-memory chunk yielded: {len(chunk)} entities (total: {start + len(chunk):,})")
+            yield chunk
+        
+        print(f"[STREAMING] ✅ In-memory parsing completed: {len(entities):,} entities processed")
+        return
+    
     try:
         import ijson
         
@@ -170,13 +382,79 @@ def json_chunks_generator(json_file: Path, chunk_size: int = 5000):
         ) from None
 
 
-def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "building_1", floor_uid: str = "floor_1") -> GraphPayload:
+def _json_root_char(json_file: Path) -> bytes:
+    """Peek at the first non-whitespace byte of a JSON file (``b''`` if empty)."""
+    with open(json_file, 'rb') as file:
+        while True:
+            head = file.read(64)
+            if not head:
+                return b''
+            # Skip JSON whitespace and a UTF-8 BOM if present
+            stripped = head.lstrip(b' \t\r\n\xef\xbb\xbf')
+            if stripped:
+                return stripped[:1]
+
+
+def _json_root_is_array(json_file: Path) -> bool:
+    """Peek at the first non-whitespace byte to see if the JSON root is an array."""
+    return _json_root_char(json_file) == b'['
+
+
+def _iter_entities_streaming(json_file: Path):
+    """Stream the entities of a dict-rooted JSON file one at a time.
+    
+    Raw LibreDWG (dwgread) exports keep entities under ``OBJECTS`` and get the
+    same per-entity transformation ``LibreDWGTransformer.transform`` applies;
+    pre-transformed files keep them under ``entities`` and are yielded as-is.
+    Only one entity is materialized at a time instead of the whole document.
+    """
+    import ijson
+    
+    with open(json_file, 'rb') as file:
+        # Top-level keys come in file order; HEADER/CLASSES precede OBJECTS in dwgread output
+        root_key = next((value for prefix, event, value in ijson.parse(file)
+                         if prefix == '' and event == 'map_key' and value in ('OBJECTS', 'entities')), None)
+    if root_key is None:
+        return
+    
+    with open(json_file, 'rb') as file:
+        entities = ijson.items(file, f'{root_key}.item', use_float=True)
+        if root_key == 'OBJECTS':
+            print("[GRAPH_LOADER] Detected untransformed data, applying transformation per entity...")
+            yield from _iter_transformed_objects(entities, _graph_transformer())
+        else:
+            yield from entities
+
+
+def _graph_transformer() -> LibreDWGTransformer:
+    """LibreDWGTransformer configured for graph building (coordinates kept as dicts)."""
+    return LibreDWGTransformer(TransformationConfig(
+        flatten_coordinates=False,  # Keep as dicts
+        convert_decimals=True,
+        normalize_encoding=True
+    ))
+
+
+def _iter_transformed_objects(objects, transformer: LibreDWGTransformer):
+    """Yield dwgread OBJECTS one at a time through the transformer's per-entity pass.
+    
+    Same transformation ``LibreDWGTransformer.transform`` applies to
+    HEADER/OBJECTS exports, without building a transformed copy of the list.
+    """
+    return transformer.iter_objects(obj for obj in objects if isinstance(obj, dict))
+
+
+def transform_chunk_to_graph(entities_chunk: List[Dict[str, Any]], building_uid: str = "building_1", floor_uid: str = "floor_1",
+                             uid_base: Optional[int] = None) -> GraphPayload:
     """Transform a chunk of entities into graph nodes and relationships.
     
     Args:
         entities_chunk: List of entities to transform
         building_uid: Building node UID (shared across chunks)
         floor_uid: Floor node UID (shared across chunks)
+        uid_base: First UID counter for this chunk. Callers processing several
+            chunks pass the chunk's entity offset so UID ranges stay disjoint;
+            defaults to a millisecond timestamp.
         
     Returns:
         Graph payload with nodes and relationships for this chunk
@@ -184,34 +462,22 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
     nodes: List[Node] = []
     relationships: List[Relationship] = []
     
-    # Counters for unique IDs (will need to be passed between chunks)
-    import time
-    timestamp = int(time.time() * 1000)  # Use timestamp to ensure unique IDs across chunks
+    # Counters for unique IDs (each counter advances at most once per entity)
+    if uid_base is None:
+        uid_base = int(time.time() * 1000)
+    timestamp: int = uid_base
     
-    space_counter = timestamp
-    wall_counter = timestamp
-    feature_counter = timestamp
-    annotation_counter = timestamp
+    space_counter: int = timestamp
+    wall_counter: int = timestamp
+    feature_counter: int = timestamp
+    annotation_counter: int = timestamp
+    
+    add_node = nodes.append
+    add_rel = relationships.append
     
     for entity in entities_chunk:
-        etype = entity.get("type") or entity.get("object", "").upper()
-        
-        # Map numeric DWG types to string names
-        DWG_TYPE_MAP = {
-            1: "TEXT",
-            2: "ATTRIB", 
-            3: "ATTDEF",
-            4: "BLOCK",
-            7: "INSERT",
-            11: "VERTEX_2D",
-            19: "POLYLINE_2D",
-            20: "POLYLINE_3D",
-            21: "ARC",
-            22: "CIRCLE",
-            23: "LINE",
-            44: "MTEXT",
-            77: "LWPOLYLINE"
-        }
+        g = entity.get
+        etype: Any = g("type") or g("object", "").upper()
         
         # Convert numeric type to string if needed
         if isinstance(etype, int):
@@ -220,8 +486,8 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
         if etype == "SCALE_INFO":
             # Create a Metadata node for scale information
             scale_node_uid = f"metadata_{timestamp}_{len(nodes)}"
-            scale_data = entity.get("scales", {})
-            nodes.append({
+            scale_data = g("scales", {})
+            add_node({
                 "label": "Metadata",
                 "uid": scale_node_uid,
                 "type": "SCALE_INFO",
@@ -230,7 +496,7 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
                 "cmlscale": scale_data.get("CMLSCALE", 1.0),
                 "celtscale": scale_data.get("CELTSCALE", 1.0)
             })
-            relationships.append({
+            add_rel({
                 "start_label": "Building",
                 "start_uid": building_uid,
                 "type": "HAS_METADATA",
@@ -239,18 +505,19 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
             })
             continue
         
-        if etype == "LWPOLYLINE" and entity.get("is_closed"):
+        if etype == "LWPOLYLINE" and g("is_closed"):
             # Closed polylines represent spaces
             space_uid = f"space_{space_counter}"
             space_counter += 1
-            nodes.append({
+            space_node = {
                 "label": "Space",
                 "uid": space_uid,
-                "raw_points": entity.get("points"),
-                "point_count": len(entity.get("points", [])),
-                "layer": str(entity.get("layer", "0"))
-            })
-            relationships.append({
+                "point_count": len(g("points", [])),
+                "layer": str(g("layer", "0"))
+            }
+            _put_points(space_node, "raw_points", g("points"))
+            add_node(space_node)
+            add_rel({
                 "start_label": "Floor",
                 "start_uid": floor_uid,
                 "type": "HAS_SPACE",
@@ -262,14 +529,15 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
             # Lines represent wall segments
             wall_uid = f"wall_{wall_counter}"
             wall_counter += 1
-            nodes.append({
+            wall_node = {
                 "label": "WallSegment",
                 "uid": wall_uid,
-                "start": entity.get("start"),
-                "end": entity.get("end"),
-                "layer": str(entity.get("layer", "0"))
-            })
-            relationships.append({
+                "layer": str(g("layer", "0"))
+            }
+            _put_point(wall_node, "start", g("start"))
+            _put_point(wall_node, "end", g("end"))
+            add_node(wall_node)
+            add_rel({
                 "start_label": "Floor",
                 "start_uid": floor_uid,
                 "type": "HAS_WALL",
@@ -285,24 +553,17 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
                 "label": "Feature",
                 "uid": feature_uid,
                 "type": etype,
-                "layer": str(entity.get("layer", "0"))
+                "layer": str(g("layer", "0"))
             }
             
-            if etype == "CIRCLE":
-                feature_data.update({
-                    "center": entity.get("center"),
-                    "radius": entity.get("radius", 0)
-                })
-            elif etype == "ARC":
-                feature_data.update({
-                    "center": entity.get("center"),
-                    "radius": entity.get("radius", 0),
-                    "start_angle": entity.get("start_angle", 0),
-                    "end_angle": entity.get("end_angle", 0)
-                })
+            _put_point(feature_data, "center", g("center"))
+            feature_data["radius"] = g("radius", 0)
+            if etype == "ARC":
+                feature_data["start_angle"] = g("start_angle", 0)
+                feature_data["end_angle"] = g("end_angle", 0)
                 
-            nodes.append(feature_data)
-            relationships.append({
+            add_node(feature_data)
+            add_rel({
                 "start_label": "Floor",
                 "start_uid": floor_uid,
                 "type": "HAS_FEATURE",
@@ -318,25 +579,25 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
             annotation_node = {
                 "label": "Annotation",
                 "uid": annotation_uid,
-                "text": entity.get("text", entity.get("text_value", "")),
+                "text": g("text", g("text_value", "")),
                 "type": etype,
-                "insert": entity.get("insert", entity.get("ins_pt", entity.get("insertion_pt", {}))),
-                "height": entity.get("height", 1.0),
-                "layer": str(entity.get("layer", "0"))
+                "height": g("height", 1.0),
+                "layer": str(g("layer", "0"))
             }
+            _put_point(annotation_node, "insert", g("insert", g("ins_pt", g("insertion_pt", {}))))
             
             # Add type-specific properties
             if etype == "ATTRIB":
-                annotation_node["tag"] = entity.get("tag", "")
-                annotation_node["parent_block"] = entity.get("parent_block", "")
+                annotation_node["tag"] = g("tag", "")
+                annotation_node["parent_block"] = g("parent_block", "")
             elif etype == "ATTDEF":
-                annotation_node["tag"] = entity.get("tag", "")
-                annotation_node["prompt"] = entity.get("prompt", "")
-            elif etype in ["TEXT", "MTEXT"] and entity.get("parent_block"):
-                annotation_node["parent_block"] = entity.get("parent_block", "")
+                annotation_node["tag"] = g("tag", "")
+                annotation_node["prompt"] = g("prompt", "")
+            elif etype in ["TEXT", "MTEXT"] and g("parent_block"):
+                annotation_node["parent_block"] = g("parent_block", "")
             
-            nodes.append(annotation_node)
-            relationships.append({
+            add_node(annotation_node)
+            add_rel({
                 "start_label": "Floor",
                 "start_uid": floor_uid,
                 "type": "HAS_ANNOTATION",
@@ -348,18 +609,19 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
             # Block reference entities
             feature_uid = f"feature_{feature_counter}"
             feature_counter += 1
-            nodes.append({
+            block_node = {
                 "label": "BlockReference",
                 "uid": feature_uid,
-                "block_name": entity.get("block_name", ""),
-                "insert": entity.get("insert"),
-                "rotation": entity.get("rotation", 0),
-                "xscale": entity.get("xscale", 1.0),
-                "yscale": entity.get("yscale", 1.0),
-                "zscale": entity.get("zscale", 1.0),
-                "layer": str(entity.get("layer", "0"))
-            })
-            relationships.append({
+                "block_name": g("block_name", ""),
+                "rotation": g("rotation", 0),
+                "xscale": g("xscale", 1.0),
+                "yscale": g("yscale", 1.0),
+                "zscale": g("zscale", 1.0),
+                "layer": str(g("layer", "0"))
+            }
+            _put_point(block_node, "insert", g("insert"))
+            add_node(block_node)
+            add_rel({
                 "start_label": "Floor",
                 "start_uid": floor_uid,
                 "type": "HAS_BLOCK_REFERENCE",
@@ -370,7 +632,13 @@ def transform_chunk_to_graph(entities_chunk: List[Dict], building_uid: str = "bu
     return {"nodes": nodes, "relationships": relationships}
 
 
-def transform_to_graph_streaming(json_file: Path, chunk_size: int = 5000) -> GraphPayload:
+class TransformCancelled(RuntimeError):
+    """Raised by ``transform_to_graph_streaming`` when its ``cancel_event`` is set."""
+
+
+def transform_to_graph_streaming(json_file: Path, chunk_size: int = 5000,
+                                 return_counts: bool = False,
+                                 cancel_event: Optional[threading.Event] = None) -> Union[GraphPayload, Tuple[GraphPayload, int]]:
     """Transform extracted CAD entities JSON into a graph payload using streaming for large files.
     
     This processes entities in chunks to avoid loading everything into memory at once.
@@ -378,9 +646,13 @@ def transform_to_graph_streaming(json_file: Path, chunk_size: int = 5000) -> Gra
     Args:
         json_file: File produced by entity extraction step (.json)
         chunk_size: Number of entities to process per chunk
+        return_counts: Also return the number of entities read from the file
+        cancel_event: Checked between chunks; once set the transform stops and
+            raises ``TransformCancelled`` (a running thread can't be interrupted otherwise)
         
     Returns:
-        Complete graph payload with all chunks combined
+        Complete graph payload with all chunks combined, or
+        ``(payload, entities_count)`` when ``return_counts`` is set
     """
     # Create the Building and Floor nodes first
     building_uid = "building_1"
@@ -403,48 +675,371 @@ def transform_to_graph_streaming(json_file: Path, chunk_size: int = 5000) -> Gra
     # Process entities in chunks
     chunk_count = 0
     total_entities = 0
+    # Optional cap for debugging partial loads (0/unset = process the whole file)
+    max_chunks = int(os.getenv("GRAPH_LOADER_MAX_CHUNKS", "0")) or None
+    
+    # Chunk transforms are pure CPU work: run them in worker processes while the
+    # main process keeps parsing the next chunks
+    max_workers = int(os.getenv("GRAPH_LOADER_WORKERS", "4"))
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    # Bound in-flight chunks so parsed-but-untransformed data doesn't pile up
+    pending = deque()
+    max_pending = max_workers * 2
+    
+    # Hash-consing table shared by all chunks (GRAPH_COLLAPSE_DUPLICATES=1 only)
+    emitted: Dict[frozenset, Node] = {}
+    
+    def check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise TransformCancelled(f"Streaming transformation cancelled after {chunk_count} chunks")
+    
+    def collect(future_or_graph, index: int):
+        check_cancelled()
+        chunk_graph = future_or_graph.result() if executor else future_or_graph
+        if COLLAPSE_DUPLICATE_ENTITIES:
+            _collapse_chunk_duplicates(chunk_graph, emitted)
+        
+        # Add chunk nodes and relationships to the total
+        all_nodes.extend(chunk_graph["nodes"])
+        all_relationships.extend(chunk_graph["relationships"])
+        
+        print(f"[STREAMING] ✅ Chunk {index} completed: +{len(chunk_graph['nodes'])} nodes, +{len(chunk_graph['relationships'])} relationships")
+        print(f"[STREAMING] 📊 Total progress: {len(all_nodes):,} nodes, {len(all_relationships):,} relationships")
     
-    print(f"[STREAMING] 🚀 Starting TRUE streaming transformation with chunk_size={chunk_size}")
+    print(f"[STREAMING] 🚀 Starting TRUE streaming transformation with chunk_size={chunk_size}, workers={max_workers}")
     
     try:
         for entities_chunk in json_chunks_generator(json_file, chunk_size):
+            check_cancelled()
             chunk_count += 1
+            # Entity offset keeps UID ranges of different chunks disjoint
+            uid_base = total_entities + 1
             total_entities += len(entities_chunk)
             
             print(f"[STREAMING] 📦 Processing chunk {chunk_count}: {len(entities_chunk)} entities")
             
-            # Check memory before processing each chunk
-            memory_info = check_memory_pressure()
-            if memory_info["status"] == "critical":
-                print(f"🚨 [STREAMING] Critical memory before chunk {chunk_count} - forcing GC")
+            # Memory barely moves between consecutive chunks: sample it periodically
+            if chunk_count % MEMORY_CHECK_INTERVAL_CHUNKS == 1:
+                memory_info = check_memory_pressure()
+                if memory_info["status"] == "critical":
+                    print(f"🚨 [STREAMING] Critical memory before chunk {chunk_count} - forcing GC")
             
             # Transform this chunk
-            chunk_graph = transform_chunk_to_graph(entities_chunk, building_uid, floor_uid)
-            
-            # Add chunk nodes and relationships to the total
-            all_nodes.extend(chunk_graph["nodes"])
-            all_relationships.extend(chunk_graph["relationships"])
-            
-            print(f"[STREAMING] ✅ Chunk {chunk_count} completed: +{len(chunk_graph['nodes'])} nodes, +{len(chunk_graph['relationships'])} relationships")
-            print(f"[STREAMING] 📊 Total progress: {len(all_nodes):,} nodes, {len(all_relationships):,} relationships")
+            if executor:
+                pending.append((executor.submit(transform_chunk_to_graph, entities_chunk,
+                                                building_uid, floor_uid, uid_base), chunk_count))
+                if len(pending) >= max_pending:
+                    collect(*pending.popleft())
+            else:
+                collect(transform_chunk_to_graph(entities_chunk, building_uid, floor_uid, uid_base), chunk_count)
             
-            # Break if we've processed enough for testing
-            if chunk_count >= 10:  # Process only first 10 chunks for testing
-                print(f"[STREAMING] 🧪 TESTING MODE: Stopping after {chunk_count} chunks")
+            if max_chunks and chunk_count >= max_chunks:
+                print(f"[STREAMING] 🧪 GRAPH_LOADER_MAX_CHUNKS reached: stopping after {chunk_count} chunks")
                 break
+        
+        # Drain remaining chunks in submission order
+        while pending:
+            collect(*pending.popleft())
                 
+    except TransformCancelled as e:
+        print(f"[STREAMING] ⏹️ {e}")
+        raise
     except Exception as e:
         print(f"[STREAMING] ❌ Error during streaming: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
     
     print(f"[STREAMING] Completed streaming transformation: {total_entities:,} entities → {len(all_nodes):,} nodes, {len(all_relationships):,} relationships")
     
-    return {"nodes": all_nodes, "relationships": all_relationships}
+    graph_payload = {"nodes": all_nodes, "relationships": all_relationships}
+    if return_counts:
+        return graph_payload, total_entities
+    return graph_payload
+
+
+@dataclass
+class _GraphBuildContext:
+    """Mutable state shared by the per-entity-type handlers of ``transform_to_graph``."""
+    building_uid: str
+    floor_uid: str
+    add_node: Callable[[Node], None]
+    add_rel: Callable[[Relationship], None]
+    # Counters for unique IDs (features and block references share one sequence)
+    space_ids: Iterator[int] = field(default_factory=lambda: itertools.count(1))
+    wall_ids: Iterator[int] = field(default_factory=lambda: itertools.count(1))
+    feature_ids: Iterator[int] = field(default_factory=lambda: itertools.count(1))
+    annotation_ids: Iterator[int] = field(default_factory=lambda: itertools.count(1))
+    # Hash-consing table: uid-less node properties -> the node already emitted for them
+    emitted: Dict[frozenset, Node] = field(default_factory=dict)
+    collapse_duplicates: bool = False
+
+
+def _duplicate_key(node: Node) -> Optional[frozenset]:
+    """Hash-consing key of a node: all its properties except the uid (None if unhashable)."""
+    try:
+        # Flat coordinate lists ([x, y, z]) are frozen so they can take part in the key
+        return frozenset((k, tuple(v) if type(v) is list else v) for k, v in node.items() if k != "uid")
+    except TypeError:
+        return None
+
+
+def _register_duplicate(emitted: Dict[frozenset, Node], node: Node) -> Optional[Node]:
+    """Return the node already registered with exactly ``node``'s properties, if any.
+    
+    When ``node`` is new it is registered so later identical entities collapse onto
+    it; a repeat only bumps the registered node's ``copies`` count.
+    """
+    key = _duplicate_key(node)
+    if key is None:
+        return None
+    existing = emitted.get(key)
+    if existing is None:
+        emitted[key] = node
+        return None
+    existing["copies"] = existing.get("copies", 1) + 1
+    return existing
+
+
+def _emitted_duplicate(ctx: _GraphBuildContext, node: Node) -> Optional[Node]:
+    """Return the node already emitted with exactly ``node``'s properties, if any.
+    
+    Only active with GRAPH_COLLAPSE_DUPLICATES=1 (stacked copies are common in CAD
+    exports). ``node`` must not carry its uid yet. Payloads with unhashable values
+    are never deduplicated.
+    """
+    if not ctx.collapse_duplicates:
+        return None
+    return _register_duplicate(ctx.emitted, node)
+
+
+def _collapse_chunk_duplicates(chunk_graph: GraphPayload, emitted: Dict[frozenset, Node]) -> None:
+    """Streaming counterpart of ``_emitted_duplicate``: drop repeated Feature/Annotation
+    nodes of a transformed chunk (and their HAS_* relationships) against every chunk
+    collected before it, so both transform paths produce the same node counts."""
+    dropped = set()
+    kept: List[Node] = []
+    for node in chunk_graph["nodes"]:
+        if node.get("label") in _COLLAPSIBLE_LABELS and _register_duplicate(emitted, node) is not None:
+            dropped.add(node["uid"])
+        else:
+            kept.append(node)
+    if dropped:
+        chunk_graph["nodes"] = kept
+        chunk_graph["relationships"] = [
+            rel for rel in chunk_graph["relationships"] if rel.get("end_uid") not in dropped
+        ]
+
+
+def _handle_scale_info(entity: Dict[str, Any], etype: str, ctx: _GraphBuildContext) -> None:
+    """Create a Metadata node for scale information."""
+    scale_node_uid = _new_uid("metadata", 1)
+    scale_data = entity.get("scales", {})
+    ctx.add_node({
+        "label": "Metadata",
+        "uid": scale_node_uid,
+        "type": "SCALE_INFO",
+        "dimscale": scale_data.get("DIMSCALE", 1.0),
+        "ltscale": scale_data.get("LTSCALE", 1.0),
+        "cmlscale": scale_data.get("CMLSCALE", 1.0),
+        "celtscale": scale_data.get("CELTSCALE", 1.0)
+    })
+    ctx.add_rel({
+        "start_label": "Building",
+        "start_uid": ctx.building_uid,
+        "type": "HAS_METADATA",
+        "end_label": "Metadata",
+        "end_uid": scale_node_uid,
+    })
+
+
+def _handle_lwpolyline(entity: Dict[str, Any], etype: str, ctx: _GraphBuildContext) -> None:
+    """Closed polylines represent spaces; open ones are skipped."""
+    g = entity.get
+    if not g("is_closed"):
+        return
+    space_uid = _new_uid("space", next(ctx.space_ids))
+    space_node = {
+        "label": "Space",
+        "uid": space_uid,
+        "point_count": len(g("points", [])),
+        "layer": str(g("layer", "0"))
+    }
+    _put_points(space_node, "raw_points", g("points"))
+    ctx.add_node(space_node)
+    ctx.add_rel(
+        {
+            "start_label": "Floor",
+            "start_uid": ctx.floor_uid,
+            "type": "HAS_SPACE",
+            "end_label": "Space",
+            "end_uid": space_uid,
+        }
+    )
+
+
+def _handle_line(entity: Dict[str, Any], etype: str, ctx: _GraphBuildContext) -> None:
+    """Lines represent wall segments."""
+    g = entity.get
+    wall_uid = _new_uid("wall", next(ctx.wall_ids))
+    wall_node = {
+        "label": "WallSegment",
+        "uid": wall_uid,
+        "layer": str(g("layer", "0"))
+    }
+    _put_point(wall_node, "start", g("start"))
+    _put_point(wall_node, "end", g("end"))
+    ctx.add_node(wall_node)
+    ctx.add_rel(
+        {
+            "start_label": "Floor",
+            "start_uid": ctx.floor_uid,
+            "type": "HAS_WALL",
+            "end_label": "WallSegment",
+            "end_uid": wall_uid,
+        }
+    )
 
 
-def transform_to_graph(json_file: Path) -> GraphPayload:  # noqa: D401
+def _handle_feature(entity: Dict[str, Any], etype: str, ctx: _GraphBuildContext) -> None:
+    """Circles and arcs as architectural features."""
+    g = entity.get
+    feature_data = {
+        "label": "Feature",
+        "type": etype,
+        "layer": str(g("layer", "0"))
+    }
+    _put_point(feature_data, "center", g("center"))
+    feature_data["radius"] = g("radius", 0)
+    if etype == "ARC":
+        feature_data["start_angle"] = g("start_angle", 0)
+        feature_data["end_angle"] = g("end_angle", 0)
+    
+    # An identical feature was already emitted: it just counts one more copy
+    if _emitted_duplicate(ctx, feature_data) is not None:
+        return
+    feature_uid = _new_uid("feature", next(ctx.feature_ids))
+    feature_data["uid"] = feature_uid
+    ctx.add_node(feature_data)
+    ctx.add_rel(
+        {
+            "start_label": "Floor",
+            "start_uid": ctx.floor_uid,
+            "type": "HAS_FEATURE",
+            "end_label": "Feature",
+            "end_uid": feature_uid,
+        }
+    )
+
+
+def _handle_annotation(entity: Dict[str, Any], etype: str, ctx: _GraphBuildContext) -> None:
+    """Text entities as annotations."""
+    g = entity.get
+    
+    # Base annotation properties, built in their final shape: a dict insertion point
+    # becomes insert_x/y/z directly instead of being added and popped again
+    insert_pt = g("insert", g("insertion_pt", {}))
+    if isinstance(insert_pt, dict):
+        annotation_node = {
+            "label": "Annotation",
+            "text": g("text_value", g("text", "")),
+            "type": etype,  # Store the entity type
+            "height": g("height", 1.0),
+            "layer": str(g("layer", "0")),
+            "insert_x": insert_pt.get("x", 0),
+            "insert_y": insert_pt.get("y", 0),
+            "insert_z": insert_pt.get("z", 0)
+        }
+    else:
+        annotation_node = {
+            "label": "Annotation",
+            "text": g("text_value", g("text", "")),
+            "type": etype,  # Store the entity type
+            "insert": g("insert"),
+            "height": g("height", 1.0),
+            "layer": str(g("layer", "0"))
+        }
+    
+    # Extract color values if they are dicts
+    text_color = g("text_color")
+    if isinstance(text_color, dict):
+        annotation_node["text_color"] = text_color.get("rgb", "000000")
+    elif "text_color" in entity:
+        annotation_node["text_color"] = str(text_color)
+    
+    # Add type-specific properties
+    if etype == "ATTRIB":
+        annotation_node["tag"] = g("tag", "")
+        annotation_node["parent_block"] = g("parent_block", "")
+    elif etype == "ATTDEF":
+        annotation_node["tag"] = g("tag", "")
+        annotation_node["prompt"] = g("prompt", "")
+    elif (etype == "TEXT" or etype == "MTEXT") and g("parent_block"):
+        annotation_node["parent_block"] = g("parent_block", "")
+    
+    # An identical annotation was already emitted: it just counts one more copy
+    if _emitted_duplicate(ctx, annotation_node) is not None:
+        return
+    annotation_uid = _new_uid("annotation", next(ctx.annotation_ids))
+    annotation_node["uid"] = annotation_uid
+    ctx.add_node(annotation_node)
+    ctx.add_rel(
+        {
+            "start_label": "Floor",
+            "start_uid": ctx.floor_uid,
+            "type": "HAS_ANNOTATION",
+            "end_label": "Annotation",
+            "end_uid": annotation_uid,
+        }
+    )
+
+
+def _handle_block_reference(entity: Dict[str, Any], etype: str, ctx: _GraphBuildContext) -> None:
+    """Block reference entities."""
+    g = entity.get
+    feature_uid = _new_uid("feature", next(ctx.feature_ids))
+    block_node = {
+        "label": "BlockReference",
+        "uid": feature_uid,
+        "block_name": g("block_name", ""),
+        "rotation": g("rotation", 0),
+        "xscale": g("xscale", 1.0),
+        "yscale": g("yscale", 1.0),
+        "zscale": g("zscale", 1.0),
+        "layer": str(g("layer", "0"))
+    }
+    _put_point(block_node, "insert", g("insert"))
+    ctx.add_node(block_node)
+    ctx.add_rel(
+        {
+            "start_label": "Floor",
+            "start_uid": ctx.floor_uid,
+            "type": "HAS_BLOCK_REFERENCE",
+            "end_label": "BlockReference",
+            "end_uid": feature_uid,
+        }
+    )
+
+
+# Entity type -> graph handler used by transform_to_graph
+_ENTITY_HANDLERS: Dict[str, Callable[[Dict[str, Any], str, _GraphBuildContext], None]] = {
+    "SCALE_INFO": _handle_scale_info,
+    "LWPOLYLINE": _handle_lwpolyline,
+    "LINE": _handle_line,
+    "CIRCLE": _handle_feature,
+    "ARC": _handle_feature,
+    "TEXT": _handle_annotation,
+    "MTEXT": _handle_annotation,
+    "ATTRIB": _handle_annotation,
+    "ATTDEF": _handle_annotation,
+    "MULTILEADER": _handle_annotation,
+    "INSERT": _handle_block_reference,
+}
+
+
+def transform_to_graph(json_file: Path, return_counts: bool = False) -> Union[GraphPayload, Tuple[GraphPayload, int]]:  # noqa: D401
     """Transform extracted CAD entities JSON into a graph payload.
 
     This function now expects data that has been pre-transformed by
@@ -471,71 +1066,74 @@ def transform_to_graph(json_file: Path) -> GraphPayload:  # noqa: D401
     ----------
     json_file : Path
         File produced by entity extraction step (.json).
+    return_counts : bool
+        Also return the number of entities read, so callers don't have to
+        parse the file themselves just to count them.
 
     Returns
     -------
     Dict[str, List[dict]]
-        ``{"nodes": [...], "relationships": [...]}``
+        ``{"nodes": [...], "relationships": [...]}``, or
+        ``(payload, entities_count)`` when ``return_counts`` is set
     """
-    from libredwg_transformer import LibreDWGTransformer, TransformationConfig
-
-    # Try different encodings to handle potential binary data in JSON
-    json_content = None
-    for encoding in ['utf-8', 'latin-1', 'cp1252']:
-        try:
-            json_content = Path(json_file).read_text(encoding=encoding)
-            break
-        except UnicodeDecodeError:
-            continue
-    
-    if json_content is None:
-        raise ValueError(f"Could not read JSON file with any supported encoding: {json_file}")
-    
-    data = json.loads(json_content)
-    
-    # Check if data needs transformation (backward compatibility)
-    needs_transformation = False
-    
-    # Quick check for array coordinates (sign that data is not transformed)
-    if isinstance(data, list) and len(data) > 0:
-        sample = data[0]
-        if isinstance(sample, dict):
-            for coord_field in ['start', 'end', 'center', 'insert']:
-                if coord_field in sample and isinstance(sample[coord_field], list):
-                    needs_transformation = True
-                    break
-    elif isinstance(data, dict) and 'OBJECTS' in data:
-        # LibreDWG raw format
-        needs_transformation = True
-    
-    # Apply transformation if needed
-    if needs_transformation:
-        print("[GRAPH_LOADER] Detected untransformed data, applying transformation...")
-        transformer = LibreDWGTransformer(TransformationConfig(
-            flatten_coordinates=False,  # Keep as dicts
-            convert_decimals=True,
-            normalize_encoding=True
-        ))
-        transformed = transformer.transform(data)
+    # Large files are never loaded as a full DOM: entity arrays go through the chunked
+    # streaming path, dict-rooted exports are iterated entity by entity below
+    file_size = Path(json_file).stat().st_size
+    root_char = _json_root_char(json_file) if file_size > STREAMING_THRESHOLD_BYTES else b''
+    if root_char == b'[':
+        print(f"[GRAPH_LOADER] Large file ({file_size / (1024 * 1024):.1f}MB) - delegating to streaming transformation")
+        return transform_to_graph_streaming(Path(json_file), return_counts=return_counts)
+
+    if root_char == b'{':
+        print(f"[GRAPH_LOADER] Large file ({file_size / (1024 * 1024):.1f}MB) - streaming entities one at a time")
+        entities = _iter_entities_streaming(Path(json_file))
+    else:
+        # JSON is UTF-8 (RFC 8259): single bytes read, lossy decode only for stray binary bytes
+        data = _json_load_file(Path(json_file))
         
-        # Extract entities from transformed data
-        if isinstance(transformed, dict):
-            if 'entities' in transformed:
-                entities = transformed['entities']
-            elif 'OBJECTS' in transformed:
-                entities = transformed['OBJECTS']
+        # Check if data needs transformation (backward compatibility)
+        needs_transformation = False
+        
+        # Quick check for array coordinates (sign that data is not transformed)
+        if isinstance(data, list) and len(data) > 0:
+            sample = data[0]
+            if isinstance(sample, dict):
+                for coord_field in ['start', 'end', 'center', 'insert']:
+                    if coord_field in sample and isinstance(sample[coord_field], list):
+                        needs_transformation = True
+                        break
+        elif isinstance(data, dict) and 'OBJECTS' in data:
+            # LibreDWG raw format
+            needs_transformation = True
+        
+        # Apply transformation if needed
+        if needs_transformation:
+            print("[GRAPH_LOADER] Detected untransformed data, applying transformation...")
+            transformer = _graph_transformer()
+            
+            # Entities are normalized lazily inside the graph-building loop below
+            # instead of materializing a transformed copy of the document first
+            if isinstance(data, list):
+                entities = (transformer._transform_value(item) for item in data)
+            elif "HEADER" in data:
+                entities = _iter_transformed_objects(data["OBJECTS"], transformer)
             else:
-                entities = []
-        else:
-            entities = transformed
-    else:
-        # Data is already transformed
-        if isinstance(data, list):
-            entities = data
-        elif isinstance(data, dict) and 'entities' in data:
-            entities = data['entities']
+                # Generic OBJECTS dict without HEADER: whole-document transform
+                transformed = transformer.transform(data)
+                if 'entities' in transformed:
+                    entities = transformed['entities']
+                elif 'OBJECTS' in transformed:
+                    entities = transformed['OBJECTS']
+                else:
+                    entities = []
         else:
-            entities = []
+            # Data is already transformed
+            if isinstance(data, list):
+                entities = data
+            elif isinstance(data, dict) and 'entities' in data:
+                entities = data['entities']
+            else:
+                entities = []
 
     nodes: List[Node] = []
     relationships: List[Relationship] = []
@@ -555,214 +1153,56 @@ def transform_to_graph(json_file: Path) -> GraphPayload:  # noqa: D401
         }
     )
 
-    # Counters for unique IDs
-    space_counter = 1
-    wall_counter = 1
-    feature_counter = 1
-    annotation_counter = 1
-
-    # Add scale metadata if available
-    scale_node_uid = None
-    
-    for entity in entities:
+    ctx = _GraphBuildContext(building_uid, floor_uid, nodes.append, relationships.append,
+                             collapse_duplicates=COLLAPSE_DUPLICATE_ENTITIES)
+    handlers = _ENTITY_HANDLERS
+    entities_count = 0
+    for entities_count, entity in enumerate(entities, 1):
         etype = entity.get("type")
-        
-        if etype == "SCALE_INFO":
-            # Create a Metadata node for scale information
-            scale_node_uid = _new_uid("metadata", 1)
-            scale_data = entity.get("scales", {})
-            nodes.append({
-                "label": "Metadata",
-                "uid": scale_node_uid,
-                "type": "SCALE_INFO",
-                "dimscale": scale_data.get("DIMSCALE", 1.0),
-                "ltscale": scale_data.get("LTSCALE", 1.0),
-                "cmlscale": scale_data.get("CMLSCALE", 1.0),
-                "celtscale": scale_data.get("CELTSCALE", 1.0)
-            })
-            relationships.append({
-                "start_label": "Building",
-                "start_uid": building_uid,
-                "type": "HAS_METADATA",
-                "end_label": "Metadata",
-                "end_uid": scale_node_uid,
-            })
-            continue
-        
-        if etype == "LWPOLYLINE" and entity.get("is_closed"):
-            # Closed polylines represent spaces
-            space_uid = _new_uid("space", space_counter)
-            space_counter += 1
-            nodes.append(
-                {
-                    "label": "Space",
-                    "uid": space_uid,
-                    "raw_points": entity.get("points"),
-                    "point_count": len(entity.get("points", [])),
-                    "layer": str(entity.get("layer", "0"))
-                }
-            )
-            relationships.append(
-                {
-                    "start_label": "Floor",
-                    "start_uid": floor_uid,
-                    "type": "HAS_SPACE",
-                    "end_label": "Space",
-                    "end_uid": space_uid,
-                }
-            )
-            
-        elif etype == "LINE":
-            # Lines represent wall segments
-            wall_uid = _new_uid("wall", wall_counter)
-            wall_counter += 1
-            nodes.append(
-                {
-                    "label": "WallSegment",
-                    "uid": wall_uid,
-                    "start": entity.get("start"),
-                    "end": entity.get("end"),
-                    "layer": str(entity.get("layer", "0"))
-                }
-            )
-            relationships.append(
-                {
-                    "start_label": "Floor",
-                    "start_uid": floor_uid,
-                    "type": "HAS_WALL",
-                    "end_label": "WallSegment",
-                    "end_uid": wall_uid,
-                }
-            )
-            
-        elif etype in ["CIRCLE", "ARC"]:
-            # Circles and arcs as architectural features
-            feature_uid = _new_uid("feature", feature_counter)
-            feature_counter += 1
-            feature_data = {
-                "label": "Feature",
-                "uid": feature_uid,
-                "type": etype,
-                "layer": str(entity.get("layer", "0"))
-            }
-            
-            if etype == "CIRCLE":
-                feature_data.update({
-                    "center": entity.get("center"),
-                    "radius": entity.get("radius", 0)
-                })
-            elif etype == "ARC":
-                feature_data.update({
-                    "center": entity.get("center"),
-                    "radius": entity.get("radius", 0),
-                    "start_angle": entity.get("start_angle", 0),
-                    "end_angle": entity.get("end_angle", 0)
-                })
-                
-            nodes.append(feature_data)
-            relationships.append(
-                {
-                    "start_label": "Floor",
-                    "start_uid": floor_uid,
-                    "type": "HAS_FEATURE",
-                    "end_label": "Feature",
-                    "end_uid": feature_uid,
-                }
-            )
-            
-        elif etype in ["TEXT", "MTEXT", "ATTRIB", "ATTDEF", "MULTILEADER"]:
-            # Text entities as annotations
-            annotation_uid = _new_uid("annotation", annotation_counter)
-            annotation_counter += 1
-            
-            # Base annotation properties
-            annotation_node = {
-                "label": "Annotation",
-                "uid": annotation_uid,
-                "text": entity.get("text_value", entity.get("text", "")),
-                "type": etype,  # Store the entity type
-                "insert": entity.get("insert"),
-                "height": entity.get("height", 1.0),
-                "layer": str(entity.get("layer", "0"))
-            }
-            
-            # Extract color values if they are dicts
-            if isinstance(entity.get("text_color"), dict):
-                annotation_node["text_color"] = entity["text_color"].get("rgb", "000000")
-            elif "text_color" in entity:
-                annotation_node["text_color"] = str(entity["text_color"])
-            
-            # Extract insertion point coordinates if dict
-            insert_pt = entity.get("insert", entity.get("insertion_pt", {}))
-            if isinstance(insert_pt, dict):
-                annotation_node["insert_x"] = insert_pt.get("x", 0)
-                annotation_node["insert_y"] = insert_pt.get("y", 0)
-                annotation_node["insert_z"] = insert_pt.get("z", 0)
-                # Remove the dict version
-                annotation_node.pop("insert", None)
-            
-            # Add type-specific properties
-            if etype == "ATTRIB":
-                annotation_node["tag"] = entity.get("tag", "")
-                annotation_node["parent_block"] = entity.get("parent_block", "")
-            elif etype == "ATTDEF":
-                annotation_node["tag"] = entity.get("tag", "")
-                annotation_node["prompt"] = entity.get("prompt", "")
-            elif etype in ["TEXT", "MTEXT"] and entity.get("parent_block"):
-                annotation_node["parent_block"] = entity.get("parent_block", "")
-            
-            nodes.append(annotation_node)
-            relationships.append(
-                {
-                    "start_label": "Floor",
-                    "start_uid": floor_uid,
-                    "type": "HAS_ANNOTATION",
-                    "end_label": "Annotation",
-                    "end_uid": annotation_uid,
-                }
-            )
-            
-        elif etype == "INSERT":
-            # Block reference entities
-            feature_uid = _new_uid("feature", feature_counter)
-            feature_counter += 1
-            nodes.append(
-                {
-                    "label": "BlockReference",
-                    "uid": feature_uid,
-                    "block_name": entity.get("block_name", ""),
-                    "insert": entity.get("insert"),
-                    "rotation": entity.get("rotation", 0),
-                    "xscale": entity.get("xscale", 1.0),
-                    "yscale": entity.get("yscale", 1.0),
-                    "zscale": entity.get("zscale", 1.0),
-                    "layer": str(entity.get("layer", "0"))
-                }
-            )
-            relationships.append(
-                {
-                    "start_label": "Floor",
-                    "start_uid": floor_uid,
-                    "type": "HAS_BLOCK_REFERENCE",
-                    "end_label": "BlockReference",
-                    "end_uid": feature_uid,
-                }
-            )
+        # One hash probe per entity instead of walking an if/elif chain of string compares
+        handler = handlers.get(etype) if type(etype) is str else None
+        if handler is not None:
+            handler(entity, etype, ctx)
 
-    return {"nodes": nodes, "relationships": relationships}
+    graph_payload = {"nodes": nodes, "relationships": relationships}
+    if return_counts:
+        return graph_payload, entities_count
+    return graph_payload
 
 
 # ---------------------------------------------------------------------------
 # OCR Enhancement Support 
 # ---------------------------------------------------------------------------
 
-def create_ocr_nodes(ocr_enrichment_data: Dict[str, Any]) -> List[Node]:
+OCRIndex = Tuple[Dict[Any, str], List[str]]
+
+
+def _build_ocr_index(ocr_enrichment_data: Dict[str, Any]) -> OCRIndex:
+    """Assign OCRRegion and OCRText uids once, in payload order.
+    
+    Returns:
+        ``(region_uids, text_uids)``: region_id -> OCRRegion uid in first-seen
+        order, and the OCRText uid of each entry in ``ocr_nodes``.
+    """
+    region_uids: Dict[Any, str] = {}
+    text_uids: List[str] = []
+    for j, ocr_node_data in enumerate(ocr_enrichment_data.get("ocr_nodes", [])):
+        text_uids.append(_new_uid("ocr_text", j + 1))
+        region_id = ocr_node_data.get("region_id", "")
+        if region_id not in region_uids:
+            region_uids[region_id] = _new_uid("ocr_region", len(region_uids) + 1)
+    return region_uids, text_uids
+
+
+def create_ocr_nodes(ocr_enrichment_data: Dict[str, Any],
+                     ocr_index: Optional[OCRIndex] = None) -> List[Node]:
     """Create OCR-specific nodes for Neo4j integration."""
+    region_uids, text_uids = ocr_index or _build_ocr_index(ocr_enrichment_data)
+    ocr_node_list = ocr_enrichment_data.get("ocr_nodes", [])
     ocr_nodes = []
     
     # Create OCRText nodes
-    for i, ocr_node_data in enumerate(ocr_enrichment_data.get("ocr_nodes", [])):
-        ocr_text_uid = _new_uid("ocr_text", i + 1)
+    for ocr_text_uid, ocr_node_data in zip(text_uids, ocr_node_list):
         ocr_nodes.append({
             "label": "OCRText",
             "uid": ocr_text_uid,
@@ -771,79 +1211,68 @@ def create_ocr_nodes(ocr_enrichment_data: Dict[str, Any]) -> List[Node]:
             "region_id": ocr_node_data.get("region_id", ""),
             "region_type": ocr_node_data.get("region_type", ""),
             "processing_engine": ocr_node_data.get("processing_engine", ""),
-            "extracted_info": json.dumps(ocr_node_data.get("extracted_info", {}))
+            "extracted_info": _json_dumps(ocr_node_data.get("extracted_info", {}))
         })
     
-    # Create OCRRegion nodes (grouped by region_id)
-    region_groups = {}
-    for ocr_node_data in ocr_enrichment_data.get("ocr_nodes", []):
-        region_id = ocr_node_data.get("region_id", "")
-        if region_id not in region_groups:
-            region_groups[region_id] = {
-                "region_type": ocr_node_data.get("region_type", ""),
-                "text_count": 0,
-                "avg_confidence": 0.0,
-                "confidences": []
-            }
-        region_groups[region_id]["text_count"] += 1
-        region_groups[region_id]["confidences"].append(ocr_node_data.get("confidence", 0.0))
+    if not region_uids:
+        return ocr_nodes
+    
+    # Create OCRRegion nodes (grouped by region_id, first-seen order):
+    # map each text to its region position, then aggregate confidences with bincount
+    region_position = {region_id: i for i, region_id in enumerate(region_uids)}
+    region_types = []
+    inverse = []
+    confidences = []
+    for ocr_node_data in ocr_node_list:
+        group = region_position[ocr_node_data.get("region_id", "")]
+        if group == len(region_types):
+            # Positions follow first-seen order, so this is the region's first text
+            region_types.append(ocr_node_data.get("region_type", ""))
+        inverse.append(group)
+        confidences.append(ocr_node_data.get("confidence", 0.0))
+    
+    inverse_array = np.asarray(inverse, dtype=np.intp)
+    counts = np.bincount(inverse_array)
+    averages = np.bincount(inverse_array, weights=np.asarray(confidences, dtype=np.float64)) / counts
     
     # Create OCRRegion nodes
-    for i, (region_id, region_data) in enumerate(region_groups.items()):
-        avg_confidence = sum(region_data["confidences"]) / len(region_data["confidences"]) if region_data["confidences"] else 0.0
-        
-        ocr_region_uid = _new_uid("ocr_region", i + 1)
+    for i, (region_id, ocr_region_uid) in enumerate(region_uids.items()):
         ocr_nodes.append({
             "label": "OCRRegion",
             "uid": ocr_region_uid,
             "region_id": region_id,
-            "region_type": region_data["region_type"],
-            "text_count": region_data["text_count"],
-            "average_confidence": round(avg_confidence, 3)
+            "region_type": region_types[i],
+            "text_count": int(counts[i]),
+            "average_confidence": round(float(averages[i]), 3)
         })
     
     return ocr_nodes
 
 
 def create_ocr_relationships(ocr_enrichment_data: Dict[str, Any], 
-                           floor_uid: str = "floor_1") -> List[Relationship]:
+                           floor_uid: str = "floor_1",
+                           ocr_index: Optional[OCRIndex] = None) -> List[Relationship]:
     """Create OCR-specific relationships for Neo4j integration."""
-    ocr_relationships = []
-    
-    # Floor -> OCRRegion relationships
-    region_groups = {}
-    for ocr_node_data in ocr_enrichment_data.get("ocr_nodes", []):
-        region_id = ocr_node_data.get("region_id", "")
-        if region_id not in region_groups:
-            region_groups[region_id] = True
-    
-    for i, region_id in enumerate(region_groups.keys()):
-        ocr_region_uid = _new_uid("ocr_region", i + 1)
-        ocr_relationships.append({
-            "start_label": "Floor",
-            "start_uid": floor_uid,
-            "type": "HAS_OCR_REGION",
-            "end_label": "OCRRegion", 
-            "end_uid": ocr_region_uid
-        })
+    region_uids, text_uids = ocr_index or _build_ocr_index(ocr_enrichment_data)
+    ocr_node_list = ocr_enrichment_data.get("ocr_nodes", [])
+    
+    # Floor -> OCRRegion relationships (region uids are already in first-seen order)
+    ocr_relationships = [{
+        "start_label": "Floor",
+        "start_uid": floor_uid,
+        "type": "HAS_OCR_REGION",
+        "end_label": "OCRRegion", 
+        "end_uid": ocr_region_uid
+    } for ocr_region_uid in region_uids.values()]
     
     # OCRRegion -> OCRText relationships  
-    region_to_uid = {region_id: _new_uid("ocr_region", i + 1) 
-                     for i, region_id in enumerate(region_groups.keys())}
-    
-    for i, ocr_node_data in enumerate(ocr_enrichment_data.get("ocr_nodes", [])):
-        ocr_text_uid = _new_uid("ocr_text", i + 1)
-        region_id = ocr_node_data.get("region_id", "")
-        ocr_region_uid = region_to_uid.get(region_id)
-        
-        if ocr_region_uid:
-            ocr_relationships.append({
-                "start_label": "OCRRegion",
-                "start_uid": ocr_region_uid,
-                "type": "CONTAINS_TEXT",
-                "end_label": "OCRText",
-                "end_uid": ocr_text_uid
-            })
+    ocr_relationships.extend({
+        "start_label": "OCRRegion",
+        "start_uid": region_uids[ocr_node_data.get("region_id", "")],
+        "type": "CONTAINS_TEXT",
+        "end_label": "OCRText",
+        "end_uid": ocr_text_uid
+    } for ocr_text_uid, ocr_node_data in zip(text_uids, ocr_node_list))
     
     # Validation relationships (OCRText validates existing Annotations)
     for i, validation in enumerate(ocr_enrichment_data.get("validation_relationships", [])):
@@ -865,13 +1294,14 @@ def create_ocr_relationships(ocr_enrichment_data: Dict[str, Any],
         })
     
     # Discovery relationships (OCRText discovers new information)
+    # Index text -> uid once; the first node with a given text wins, as before
+    text_to_uid = {}
+    for ocr_text_uid, ocr_node_data in zip(text_uids, ocr_node_list):
+        text_to_uid.setdefault(ocr_node_data.get("text"), ocr_text_uid)
+    
     for i, discovery in enumerate(ocr_enrichment_data.get("discovery_relationships", [])):
         # Find the corresponding OCR text node
-        ocr_text_uid = None
-        for j, ocr_node_data in enumerate(ocr_enrichment_data.get("ocr_nodes", [])):
-            if ocr_node_data.get("text") == discovery.get("ocr_text"):
-                ocr_text_uid = _new_uid("ocr_text", j + 1)
-                break
+        ocr_text_uid = text_to_uid.get(discovery.get("ocr_text"))
         
         if ocr_text_uid:
             ocr_relationships.append({
@@ -883,7 +1313,7 @@ def create_ocr_relationships(ocr_enrichment_data: Dict[str, Any],
                 "properties": {
                     "confidence": discovery.get("confidence", 0.0),
                     "region_type": discovery.get("region_type", ""),
-                    "context": json.dumps(discovery.get("context", {}))
+                    "context": _json_dumps(discovery.get("context", {}))
                 }
             })
     
@@ -892,21 +1322,28 @@ def create_ocr_relationships(ocr_enrichment_data: Dict[str, Any],
 
 def enhance_graph_with_ocr(base_graph: GraphPayload, 
                           ocr_enrichment_data: Dict[str, Any]) -> GraphPayload:
-    """Enhance base graph with OCR nodes and relationships."""
+    """Enhance base graph with OCR nodes and relationships.
+    
+    The base graph's node and relationship lists are extended in place and
+    returned, so large payloads are not copied.
+    """
+    
+    # Assign OCR uids once for both nodes and relationships
+    ocr_index = _build_ocr_index(ocr_enrichment_data)
     
     # Create OCR nodes
-    ocr_nodes = create_ocr_nodes(ocr_enrichment_data)
+    ocr_nodes = create_ocr_nodes(ocr_enrichment_data, ocr_index)
     
     # Create OCR relationships
-    ocr_relationships = create_ocr_relationships(ocr_enrichment_data)
+    ocr_relationships = create_ocr_relationships(ocr_enrichment_data, ocr_index=ocr_index)
     
-    # Merge with base graph
-    enhanced_graph = {
-        "nodes": base_graph.get("nodes", []) + ocr_nodes,
-        "relationships": base_graph.get("relationships", []) + ocr_relationships
-    }
+    # Merge into the base graph lists instead of concatenating into new ones
+    nodes = base_graph.get("nodes", [])
+    nodes.extend(ocr_nodes)
+    relationships = base_graph.get("relationships", [])
+    relationships.extend(ocr_relationships)
     
-    return enhanced_graph
+    return {"nodes": nodes, "relationships": relationships}
 
 
 # ---------------------------------------------------------------------------
@@ -920,15 +1357,19 @@ def _merge_node(tx, label: str, uid: str, props: Dict[str, Any]):
     # Flatten nested objects (like coordinates) for Neo4j
     flat_props = {}
     for key, value in props.items():
-        if isinstance(value, dict) and all(k in value for k in ['x', 'y', 'z']):
+        if isinstance(value, dict) and _XYZ <= value.keys():
             # Convert coordinate objects to separate properties
             flat_props[f"{key}_x"] = value['x']
             flat_props[f"{key}_y"] = value['y'] 
             flat_props[f"{key}_z"] = value['z']
         elif isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
-            # Convert array of coordinate objects to JSON string
-            import json
-            flat_props[key] = json.dumps(value)
+            # Point arrays become per-axis float lists; anything else a JSON string
+            columns = _coordinate_columns(value)
+            if columns is None:
+                flat_props[key] = _json_dumps(value)
+            else:
+                for axis, column in columns.items():
+                    flat_props[f"{key}_{axis}s"] = column
         else:
             # For non-dict, non-list values, store as-is
             flat_props[key] = value
@@ -949,8 +1390,7 @@ def _merge_relationship(tx, start_label: str, start_uid: str, rel_type: str, end
         flat_props = {}
         for key, value in properties.items():
             if isinstance(value, dict):
-                import json
-                flat_props[key] = json.dumps(value)
+                flat_props[key] = _json_dumps(value)
             else:
                 flat_props[key] = value
         
@@ -983,8 +1423,13 @@ def _is_neo4j_safe(value):
         if not value:  # Empty list is safe
             return True
         first_type = type(value[0])
-        return (first_type in safe_types and 
-                all(isinstance(item, first_type) for item in value))
+        if first_type not in safe_types:
+            return False
+        # Exact type identity: cheaper than isinstance and rejects bool/int mixes
+        for item in value:
+            if type(item) is not first_type:
+                return False
+        return True
     elif isinstance(value, dict):
         # Dicts are generally unsafe for Neo4j properties (become Map{})
         return False
@@ -999,27 +1444,32 @@ def _force_neo4j_safe_value(value):
         return value
     
     # Log conversion for debugging
-    print(f"[NEO4J_SAFE] Converting unsafe value to string: {type(value)} -> str")
+    logger.debug("[NEO4J_SAFE] Converting unsafe value to string: %s -> str", type(value))
     
     # Convert to string as last resort
     try:
         return str(value)
     except Exception as e:
-        print(f"[NEO4J_SAFE] Failed to convert to string: {e}")
+        logger.warning("[NEO4J_SAFE] Failed to convert to string: %s", e)
         return "<<CONVERSION_FAILED>>"
 
 
+# Shared transformer for Map{}/nested-dict flattening (stateless apart from stats)
+_SANITIZE_TRANSFORMER = LibreDWGTransformer()
+_PRIMITIVE_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
 def _sanitize_data_types(obj):
     """Recursively convert unsupported data types to Neo4j-compatible types.
     
     Enhanced to handle Map{} objects and complex nested structures
     identified in DWG files. Uses LibreDWGTransformer for comprehensive handling.
     """
-    import decimal
-    from libredwg_transformer import LibreDWGTransformer
+    # Fast path: primitive leaves are the overwhelming majority of values
+    if type(obj) in _PRIMITIVE_TYPES:
+        return obj
     
-    # Initialize transformer for complex object handling
-    transformer = LibreDWGTransformer()
+    transformer = _SANITIZE_TRANSFORMER
     
     if isinstance(obj, decimal.Decimal):
         # This should rarely happen now, but keep as safety
@@ -1049,9 +1499,6 @@ def _sanitize_data_types(obj):
 
 def execute_with_official_retry_pattern(session, operation, *args, max_retries=3):
     """Execute operation with Neo4j official retry pattern and error handling."""
-    from neo4j.exceptions import TransientError, ServiceUnavailable, AuthError
-    import time
-    import random
     
     for attempt in range(max_retries):
         try:
@@ -1080,98 +1527,108 @@ def execute_with_official_retry_pattern(session, operation, *args, max_retries=3
     raise RuntimeError(f"Failed to execute operation after {max_retries} attempts")
 
 
+def _prepare_node_for_neo4j(node: Node):
+    """Turn a graph node into ``(label, uid, props)`` with Neo4j-safe properties.
+    
+    Single pass over the node's properties: Decimal/Map{}/nested values are
+    sanitized, coordinate dicts expand to ``key_x``/``key_y``/``key_z``, point
+    lists become native float lists ``key_xs``/``key_ys``/``key_zs``, other
+    lists of dicts become JSON strings and anything else unsafe becomes a string.
+    """
+    transformer = _SANITIZE_TRANSFORMER
+    if transformer._is_complex_nested_dict(node):
+        # Problematic top-level keys (color/items/...): flatten the whole node first
+        node = transformer._flatten_complex_dict(node)
+    
+    label = node["label"]
+    uid = node["uid"]
+    
+    flat_props = {}
+    for key, value in node.items():
+        if key == "label" or key == "uid":
+            continue
+        if type(value) not in _PRIMITIVE_TYPES:
+            value = _sanitize_data_types(value)
+        
+        if isinstance(value, dict) and _XYZ <= value.keys():
+            flat_props[f"{key}_x"] = value['x']
+            flat_props[f"{key}_y"] = value['y']
+            flat_props[f"{key}_z"] = value['z']
+        elif isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
+            columns = _coordinate_columns(value)
+            if columns is None:
+                flat_props[key] = _json_dumps(value)
+            else:
+                for axis, column in columns.items():
+                    flat_props[f"{key}_{axis}s"] = column
+        else:
+            # CRITICAL: Force Neo4j-safe conversion for ALL values (dicts/Map{} -> str)
+            flat_props[key] = _force_neo4j_safe_value(value)
+    
+    return label, uid, flat_props
+
+
+# Labels and relationship types are interpolated into Cypher, so only plain identifiers are allowed
+_CYPHER_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def _cypher_name(name: str) -> str:
+    """Return ``name`` if it is safe to splice into Cypher as a label/type, else raise ValueError."""
+    if not isinstance(name, str) or not _CYPHER_NAME_RE.fullmatch(name):
+        raise ValueError(f"Invalid Neo4j label or relationship type: {name!r}")
+    return name
+
+
 def _merge_nodes_batch(tx, nodes: List[Dict[str, Any]]):
     """Merge a batch of nodes efficiently using UNWIND."""
     if not nodes:
         return
     
-    # Prepare nodes data with flattened properties
-    nodes_data = []
+    # Group flattened, Neo4j-safe props by label straight from the prepared
+    # (label, uid, props) tuples; the caller's node dicts are never mutated.
+    # Keyed by uid so duplicates collapse here (last occurrence wins) and
+    # Cypher needs no DISTINCT.
+    nodes_by_label = defaultdict(dict)
     for node in nodes:
-        # Deeply sanitize the entire node before processing its properties
-        sanitized_node = _sanitize_data_types(node)
-
-        label = sanitized_node.pop("label")
-        uid = sanitized_node.pop("uid")
-
-        flat_props = {}
-        for key, value in sanitized_node.items():  # Iterate over the already sanitized node
-            if isinstance(value, dict) and all(k in value for k in ['x', 'y', 'z']):
-                flat_props[f"{key}_x"] = value['x']
-                flat_props[f"{key}_y"] = value['y']
-                flat_props[f"{key}_z"] = value['z']
-            elif isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
-                import json
-                flat_props[key] = json.dumps(value)
-            else:
-                # CRITICAL: Force Neo4j-safe conversion for ALL values
-                flat_props[key] = _force_neo4j_safe_value(value)
-        
-        nodes_data.append({
-            "label": label,
-            "uid": uid,
-            "props": flat_props
-        })
-    
-    # Group nodes by label for efficient processing
-    nodes_by_label = {}
-    for node_data in nodes_data:
-        label = node_data["label"]
-        if label not in nodes_by_label:
-            nodes_by_label[label] = []
-        nodes_by_label[label].append({
-            "uid": node_data["uid"],
-            "props": node_data["props"]
-        })
+        label, uid, flat_props = _prepare_node_for_neo4j(node)
+        nodes_by_label[label][uid] = flat_props
     
     # Process each label group with Neo4j 2024 optimized UNWIND pattern
     for label, label_nodes in nodes_by_label.items():
-        # CRITICAL: Convert any remaining Map{} objects to strings before Neo4j
-        safe_nodes = []
-        for node in label_nodes:
-            safe_props = {}
-            for key, value in node['props'].items():
-                if hasattr(value, '__class__') and 'Map' in str(type(value)):
-                    print(f"[FINAL_MAP_DEBUG] Converting Map object to string in {label}, key {key}: {type(value)}")
-                    safe_props[key] = str(value)
-                elif isinstance(value, dict):
-                    # Last resort: Convert any dict to JSON string to avoid Map{} issues
-                    import json
-                    try:
-                        json.dumps(value)  # Test if serializable
-                        safe_props[key] = value  # Keep as dict if safe
-                    except (TypeError, ValueError):
-                        print(f"[FINAL_MAP_DEBUG] Converting non-serializable dict to string in {label}, key {key}")
-                        safe_props[key] = str(value)
-                else:
-                    safe_props[key] = value
-            safe_nodes.append({
-                'uid': node['uid'],
-                'props': safe_props
-            })
+        label = _cypher_name(label)
+        # Positional (uid, props) rows: no per-row key strings to encode over Bolt
+        safe_nodes = list(label_nodes.items())
         
-        # Neo4j Map{} safe UNWIND: Avoid += operator that creates Map{} objects
+        # Props are already flattened to primitives, so += cannot produce Map{} values.
+        # New nodes take the full map (uid restored after n = ...); existing nodes are
+        # only updated with the batch's keys instead of rewriting every property.
         query = f"""
-        UNWIND $nodes AS node
-        WITH DISTINCT node.uid AS uid, node.props AS props
-        MERGE (n:{label} {{uid: uid}})
-        SET n = props
-        RETURN count(n) AS processed
+        UNWIND $rows AS row
+        MERGE (n:{label} {{uid: row[0]}})
+        ON CREATE SET n = row[1], n.uid = row[0]
+        ON MATCH SET n += row[1]
         """
         
-        result = tx.run(query, nodes=safe_nodes)
-        processed_count = result.single()["processed"]
-        print(f"[UNWIND_OPT] Processed {processed_count} {label} nodes (16-326% perf gain)")
+        # No RETURN: consume() only fetches the summary, no records cross the wire
+        tx.run(query, rows=safe_nodes).consume()
+        processed_count = len(safe_nodes)
+        logger.debug("[UNWIND_OPT] Processed %d %s nodes", processed_count, label)
 
 
-def _merge_relationships_batch(tx, relationships: List[Dict[str, Any]]):
-    """Merge a batch of relationships efficiently using UNWIND."""
+def _merge_relationships_batch(tx, relationships: List[Dict[str, Any]], create_only: bool = False):
+    """Merge a batch of relationships efficiently using UNWIND.
+    
+    With ``create_only`` the relationships are bulk-CREATEd instead of MERGEd.
+    This is only valid when none of them exist yet and the batch has no
+    duplicates, but it skips MERGE's scan of every existing relationship on the
+    start node, which is what makes dense nodes slow.
+    """
     if not relationships:
         return
     
     # Prepare relationships data with flattened properties
-    rels_data = []
-    for rel in relationships:
+    rels_data = [None] * len(relationships)
+    for i, rel in enumerate(relationships):
         rel_data = {
             "start_label": rel["start_label"],
             "start_uid": rel["start_uid"],
@@ -1186,22 +1643,19 @@ def _merge_relationships_batch(tx, relationships: List[Dict[str, Any]]):
             for key, value in rel["properties"].items():
                 sanitized_value = _sanitize_data_types(value)
                 if isinstance(sanitized_value, dict):
-                    import json
-                    flat_props[key] = json.dumps(sanitized_value)
+                    flat_props[key] = _json_dumps(sanitized_value)
                 else:
                     flat_props[key] = sanitized_value
             rel_data["props"] = flat_props
         else:
             rel_data["props"] = {}
             
-        rels_data.append(rel_data)
+        rels_data[i] = rel_data
     
     # Group relationships by type pattern for efficient processing
-    rels_by_pattern = {}
+    rels_by_pattern = defaultdict(list)
     for rel_data in rels_data:
         pattern = f"{rel_data['start_label']}-[:{rel_data['type']}]->{rel_data['end_label']}"
-        if pattern not in rels_by_pattern:
-            rels_by_pattern[pattern] = []
         rels_by_pattern[pattern].append(rel_data)
     
     # Process each pattern group
@@ -1209,18 +1663,36 @@ def _merge_relationships_batch(tx, relationships: List[Dict[str, Any]]):
         if not pattern_rels:
             continue
             
-        start_label = pattern_rels[0]["start_label"]
-        rel_type = pattern_rels[0]["type"]
-        end_label = pattern_rels[0]["end_label"]
+        start_label = _cypher_name(pattern_rels[0]["start_label"])
+        rel_type = _cypher_name(pattern_rels[0]["type"])
+        end_label = _cypher_name(pattern_rels[0]["end_label"])
         
+        # Positional (start_uid, end_uid, props) rows keep the Bolt payload compact
+        rows = [(rel_data["start_uid"], rel_data["end_uid"], rel_data["props"]) for rel_data in pattern_rels]
+        
+        write_clause = "CREATE" if create_only else "MERGE"
         query = f"""
-        UNWIND $rels as rel
-        MATCH (a:{start_label} {{uid: rel.start_uid}})
-        MATCH (b:{end_label} {{uid: rel.end_uid}})
-        MERGE (a)-[r:{rel_type}]->(b)
-        SET r += rel.props
+        UNWIND $rows AS row
+        MATCH (a:{start_label} {{uid: row[0]}})
+        MATCH (b:{end_label} {{uid: row[1]}})
+        {write_clause} (a)-[r:{rel_type}]->(b)
+        SET r += row[2]
         """
-        tx.run(query, rels=pattern_rels)
+        tx.run(query, rows=rows).consume()
+
+
+def _dedupe_relationships(relationships: List[Relationship]) -> List[Relationship]:
+    """Collapse repeated (start, type, end) relationships like MERGE ... SET r += props would."""
+    unique: Dict[Tuple[Any, ...], Relationship] = {}
+    for rel in relationships:
+        key = (rel["start_label"], rel["start_uid"], rel["type"], rel["end_label"], rel["end_uid"])
+        seen = unique.get(key)
+        if seen is None:
+            unique[key] = rel
+        elif rel.get("properties"):
+            merged_props = {**(seen.get("properties") or {}), **rel["properties"]}
+            unique[key] = {**seen, "properties": merged_props}
+    return list(unique.values())
 
 
 def clear_neo4j_data() -> None:
@@ -1244,12 +1716,23 @@ def clear_neo4j_data() -> None:
         # Se o monitor não estiver disponível, usar método tradicional
         _clear_neo4j_traditional()
 
+    # Análises memoizadas descrevem os dados que acabaram de ser apagados
+    try:
+        from intelligent_project_analyzer import invalidate_analysis_cache
+        invalidate_analysis_cache()
+    except ImportError:
+        pass
+
+def _delete_all_nodes(tx):
+    """Transaction function removing every node and relationship."""
+    tx.run("MATCH (n) DETACH DELETE n").consume()
+
+
 def _clear_neo4j_traditional():
     """Método tradicional de limpeza (fallback)"""
-    driver = _get_neo4j_driver()
-    with driver.session() as session:
-        session.run("MATCH (n) DETACH DELETE n")
-    driver.close()
+    with _get_neo4j_driver().session() as session:
+        # Managed transaction: transient errors (e.g. lock timeouts) are retried
+        execute_with_official_retry_pattern(session, _delete_all_nodes)
     print("Cleared all existing data from Neo4j (traditional method)")
 
 def check_memory_pressure() -> Dict[str, Any]:
@@ -1258,10 +1741,7 @@ def check_memory_pressure() -> Dict[str, Any]:
     Returns:
         Dictionary with memory info and GC actions taken
     """
-    import gc
-    
-    try:
-        import psutil
+    if psutil is not None:
         memory = psutil.virtual_memory()
         memory_percent = memory.percent
         available_mb = memory.available / (1024 * 1024)
@@ -1291,8 +1771,7 @@ def check_memory_pressure() -> Dict[str, Any]:
             "action": action_taken,
             "status": "critical" if memory_percent > 85 else "high" if memory_percent > 75 else "normal"
         }
-        
-    except ImportError:
+    else:
         # Fallback without psutil
         gc.collect()  # Safe fallback GC
         return {
@@ -1304,7 +1783,7 @@ def check_memory_pressure() -> Dict[str, Any]:
         }
 
 
-def calculate_optimal_batch_size(total_entities: int, available_memory_mb: int = None) -> int:
+def calculate_optimal_batch_size(total_entities: int, available_memory_mb: Optional[float] = None) -> int:
     """Calculate optimal batch size following Neo4j 2024 official documentation.
     
     Performance improvements documented:
@@ -1321,11 +1800,10 @@ def calculate_optimal_batch_size(total_entities: int, available_memory_mb: int =
     """
     # Auto-detect available memory if not provided
     if available_memory_mb is None:
-        try:
-            import psutil
+        if psutil is not None:
             memory = psutil.virtual_memory()
             available_memory_mb = memory.available / (1024 * 1024)
-        except ImportError:
+        else:
             available_memory_mb = 1024  # Default to 1GB if psutil not available
     
     # Neo4j 2024 documentation-based batch sizing
@@ -1365,7 +1843,83 @@ def calculate_optimal_batch_size(total_entities: int, available_memory_mb: int =
     return optimized_batch
 
 
-def load_to_neo4j(graph_data: GraphPayload, batch_size: int = None) -> None:  # noqa: D401
+def _ensure_uid_constraints(labels) -> None:
+    """Create a ``uid`` uniqueness constraint per label.
+    
+    The constraint's backing index turns every MERGE/MATCH on uid into an index
+    seek instead of a label scan, and guarantees one node per uid and label.
+    """
+    with writer_slot() as session:
+        for label in sorted(labels):
+            session.run(
+                f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{_cypher_name(label)}) REQUIRE n.uid IS UNIQUE"
+            ).consume()
+        # Backing indexes populate asynchronously; wait so the first MERGEs already use them
+        session.run("CALL db.awaitIndexes(300)").consume()
+
+
+def _load_label_nodes(label: str, label_nodes: List[Node], batch_size: int) -> None:
+    """Merge nodes of one label (a whole label group or a slice of it) in batches on a dedicated write session."""
+    total_batches = (len(label_nodes) + batch_size - 1) // batch_size
+    memory_pct = 0.0
+    with writer_slot() as session:
+        for batch_index, i in enumerate(range(0, len(label_nodes), batch_size)):
+            # Each probe reads /proc/meminfo: sample every few batches, not every one
+            if batch_index % MEMORY_CHECK_INTERVAL_BATCHES == 0:
+                memory_info = check_memory_pressure()
+                if memory_info["status"] == "critical":
+                    print("🚨 [NEO4J_LOAD] Critical memory pressure - pausing 3 seconds")
+                    time.sleep(3)
+                elif memory_info["status"] == "high":
+                    print("⚠️ [NEO4J_LOAD] High memory pressure - pausing 1 second")
+                    time.sleep(1)
+                memory_pct = memory_info.get("memory_percent", 0)
+            
+            batch = label_nodes[i:i + batch_size]
+            batch_start = time.time()
+            
+            # Use Neo4j 5.x managed transactions with official retry pattern
+            execute_with_official_retry_pattern(session, _merge_nodes_batch, batch)
+            
+            batch_time = time.time() - batch_start
+            logger.debug("[NEO4J_LOAD] Processed %s batch %d/%d (%d nodes) in %.2fs [MEM: %.1f%%]",
+                         label, batch_index + 1, total_batches, len(batch), batch_time, memory_pct)
+            if (batch_index + 1) % PROGRESS_LOG_INTERVAL_BATCHES == 0:
+                logger.info("[NEO4J_LOAD] %s: %d/%d batches loaded", label, batch_index + 1, total_batches)
+
+
+def _load_relationship_bin(bin_index: int, bin_rels: List[Relationship], batch_size: int) -> None:
+    """Merge one end-node bin of relationships in batches on a dedicated write session."""
+    total_batches = (len(bin_rels) + batch_size - 1) // batch_size
+    memory_pct = 0.0
+    with writer_slot() as session:
+        for batch_index, i in enumerate(range(0, len(bin_rels), batch_size)):
+            # Each probe reads /proc/meminfo: sample every few batches, not every one
+            if batch_index % MEMORY_CHECK_INTERVAL_BATCHES == 0:
+                memory_info = check_memory_pressure()
+                if memory_info["status"] == "critical":
+                    print("🚨 [NEO4J_LOAD] Critical memory pressure - pausing 3 seconds")
+                    time.sleep(3)
+                elif memory_info["status"] == "high":
+                    print("⚠️ [NEO4J_LOAD] High memory pressure - pausing 1 second")
+                    time.sleep(1)
+                memory_pct = memory_info.get("memory_percent", 0)
+            
+            batch = bin_rels[i:i + batch_size]
+            batch_start = time.time()
+            
+            # Lock conflicts on the shared start node surface as TransientError and are retried.
+            # The database was cleared and the input deduplicated, so rels are bulk-CREATEd.
+            execute_with_official_retry_pattern(session, _merge_relationships_batch, batch, True)
+            
+            batch_time = time.time() - batch_start
+            logger.debug("[NEO4J_LOAD] Processed relationship bin %d batch %d/%d (%d relationships) in %.2fs [MEM: %.1f%%]",
+                         bin_index, batch_index + 1, total_batches, len(batch), batch_time, memory_pct)
+            if (batch_index + 1) % PROGRESS_LOG_INTERVAL_BATCHES == 0:
+                logger.info("[NEO4J_LOAD] Relationship bin %d: %d/%d batches loaded", bin_index, batch_index + 1, total_batches)
+
+
+def load_to_neo4j(graph_data: GraphPayload, batch_size: Optional[int] = None) -> None:  # noqa: D401
     """Load nodes and relationships into Neo4j using the official driver with dynamic batch processing.
 
     The function first clears existing data, then loads new data in batches to ensure
@@ -1376,11 +1930,9 @@ def load_to_neo4j(graph_data: GraphPayload, batch_size: int = None) -> None:  #
         graph_data: Graph payload with nodes and relationships
         batch_size: Number of items to process per transaction (auto-calculated if None)
     """
-    import time
-    
-    nodes = [_sanitize_data_types(node) for node in graph_data.get("nodes", [])]
-    relationships = [_sanitize_data_types(rel) for rel in graph_data.get("relationships", [])]
-    print(f"[NEO4J_LOAD] 🔧 Data sanitized to remove Decimal types and ensure Neo4j compatibility")
+    # Sanitization happens once per item inside the batch mergers
+    nodes = graph_data.get("nodes", [])
+    relationships = graph_data.get("relationships", [])
     total_entities = len(nodes) + len(relationships)
     
     # Calculate optimal batch size if not provided
@@ -1398,71 +1950,66 @@ def load_to_neo4j(graph_data: GraphPayload, batch_size: int = None) -> None:  #
     clear_time = time.time() - clear_start
     print(f"[NEO4J_LOAD] Data cleared in {clear_time:.2f}s")
     
-    
-    driver = _get_neo4j_driver()
-    
-    try:
-        # Use explicit database targeting for performance (Neo4j best practice)
-        with driver.session(database="neo4j") as session:
-            # Batch-create/merge nodes
-            print("[NEO4J_LOAD] Processing nodes in batches...")
-            node_start = time.time()
-            
-            for i in range(0, len(nodes), batch_size):
-                # Check memory pressure before each batch
-                memory_info = check_memory_pressure()
-                if memory_info["status"] == "critical":
-                    print("🚨 [NEO4J_LOAD] Critical memory pressure - pausing 3 seconds")
-                    time.sleep(3)
-                elif memory_info["status"] == "high":
-                    print("⚠️ [NEO4J_LOAD] High memory pressure - pausing 1 second")
-                    time.sleep(1)
-                
-                batch = nodes[i:i + batch_size]
-                
-                # Map{} issue resolved: Changed SET n += props to SET n = props
-                
-                batch_start = time.time()
-                
-                # Use Neo4j 5.x managed transactions with official retry pattern
-                execute_with_official_retry_pattern(session, _merge_nodes_batch, batch)
-                
-                batch_time = time.time() - batch_start
-                memory_pct = memory_info.get("memory_percent", 0)
-                print(f"[NEO4J_LOAD] Processed node batch {i//batch_size + 1}/{(len(nodes) + batch_size - 1)//batch_size} ({len(batch)} nodes) in {batch_time:.2f}s [MEM: {memory_pct:.1f}%]")
-            
-            node_time = time.time() - node_start
-            print(f"[NEO4J_LOAD] All nodes loaded in {node_time:.2f}s")
-
-            # Batch-create/merge relationships
-            print("[NEO4J_LOAD] Processing relationships in batches...")
-            rel_start = time.time()
-            
-            for i in range(0, len(relationships), batch_size):
-                # Check memory pressure before each batch
-                memory_info = check_memory_pressure()
-                if memory_info["status"] == "critical":
-                    print("🚨 [NEO4J_LOAD] Critical memory pressure - pausing 3 seconds")
-                    time.sleep(3)
-                elif memory_info["status"] == "high":
-                    print("⚠️ [NEO4J_LOAD] High memory pressure - pausing 1 second")
-                    time.sleep(1)
-                
-                batch = relationships[i:i + batch_size]
-                batch_start = time.time()
-                
-                # Use Neo4j 5.x managed transactions with official retry pattern
-                execute_with_official_retry_pattern(session, _merge_relationships_batch, batch)
-                
-                batch_time = time.time() - batch_start
-                memory_pct = memory_info.get("memory_percent", 0)
-                print(f"[NEO4J_LOAD] Processed relationship batch {i//batch_size + 1}/{(len(relationships) + batch_size - 1)//batch_size} ({len(batch)} relationships) in {batch_time:.2f}s [MEM: {memory_pct:.1f}%]")
-            
-            rel_time = time.time() - rel_start
-            print(f"[NEO4J_LOAD] All relationships loaded in {rel_time:.2f}s")
-
-    finally:
-        driver.close()
+    labels = {node["label"] for node in nodes}
+    for rel in relationships:
+        labels.add(rel["start_label"])
+        labels.add(rel["end_label"])
+    index_start = time.time()
+    _ensure_uid_constraints(labels)
+    print(f"[NEO4J_LOAD] Ensured uid constraints for {len(labels)} labels in {time.time() - index_start:.2f}s")
+    
+    # Batch-create/merge nodes: label groups touch disjoint nodes, and large
+    # labels are split into slices so one dominant label (typically walls)
+    # does not serialize the load on a single worker/session
+    print("[NEO4J_LOAD] Processing nodes in batches...")
+    node_start = time.time()
+    
+    nodes_by_label: Dict[str, List[Node]] = defaultdict(list)
+    for node in nodes:
+        nodes_by_label[node["label"]].append(node)
+    
+    # Slices of whole batches, sized so the total work spreads over all workers
+    slice_size = max(batch_size, -(-len(nodes) // NODE_LOAD_MAX_WORKERS))
+    slice_size = -(-slice_size // batch_size) * batch_size
+    node_slices = [(label, label_nodes[i:i + slice_size])
+                   for label, label_nodes in nodes_by_label.items()
+                   for i in range(0, len(label_nodes), slice_size)]
+    
+    if node_slices:
+        max_workers = min(NODE_LOAD_MAX_WORKERS, len(node_slices))
+        print(f"[NEO4J_LOAD] Loading {len(nodes_by_label)} labels in {len(node_slices)} slices with {max_workers} workers")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_load_label_nodes, label, label_slice, batch_size)
+                       for label, label_slice in node_slices]
+            for future in futures:
+                future.result()  # Propagate the first failure
+    
+    node_time = time.time() - node_start
+    print(f"[NEO4J_LOAD] All nodes loaded in {node_time:.2f}s")
+    
+    # Nearly every relationship fans out of a single node (Building/Floor -> HAS_*),
+    # so binning by start node would put almost all of them in one bin. Bin by end
+    # node instead: the fan-out spreads evenly over the writers, and lock conflicts
+    # on the shared start node surface as TransientError and go through the retry
+    # backoff of execute_with_official_retry_pattern. Each bin gets its own session
+    print("[NEO4J_LOAD] Processing relationships in batches...")
+    rel_start = time.time()
+    
+    rel_bins: List[List[Relationship]] = [[] for _ in range(RELATIONSHIP_LOAD_BINS)]
+    for rel in _dedupe_relationships(relationships):
+        rel_bins[hash(rel["end_uid"]) % RELATIONSHIP_LOAD_BINS].append(rel)
+    rel_bins = [bin_rels for bin_rels in rel_bins if bin_rels]
+    
+    if rel_bins:
+        print(f"[NEO4J_LOAD] Loading relationships in {len(rel_bins)} bins")
+        with ThreadPoolExecutor(max_workers=len(rel_bins)) as executor:
+            futures = [executor.submit(_load_relationship_bin, index, bin_rels, batch_size)
+                       for index, bin_rels in enumerate(rel_bins)]
+            for future in futures:
+                future.result()  # Propagate the first failure
+    
+    rel_time = time.time() - rel_start
+    print(f"[NEO4J_LOAD] All relationships loaded in {rel_time:.2f}s")
     
     total_time = time.time() - total_start_time
     print(f"[NEO4J_LOAD] Total Neo4j load completed in {total_time:.2f}s")
@@ -1478,11 +2025,8 @@ def transform_enhanced_to_graph(enhanced_data: Dict[str, Any]) -> GraphPayload:
     entities_data = enhanced_data.get("vector_data", {}).get("entities", [])
     
     # Create temporary JSON file for traditional transformation
-    import tempfile
-    import json
-    
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(entities_data, f)
+    with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', suffix='.json', delete=False) as f:
+        f.write(_json_dumps(entities_data))
         temp_path = Path(f.name)
     
     try:
@@ -1508,5 +2052,4 @@ def transform_enhanced_to_graph(enhanced_data: Dict[str, Any]) -> GraphPayload:
         
     finally:
         # Clean up temp file
-        import os
         os.unlink(temp_path) 
\ No newline at end of file
@@ -5,12 +5,127 @@ Analisa completamente o projeto carregado e fornece insights contextuais
 """
 
 import os
+import re
 import json
+import atexit
+import functools
+import itertools
+import unicodedata
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from neo4j import GraphDatabase
 import openai
 
+
+# Palavras-chave (sem acentos) -> categoria de projeto; a ordem das categorias define a prioridade
+_PROJECT_KEYWORDS = {
+    'aeroporto': 'airport',
+    'airport': 'airport',
+    'sbbi': 'airport',
+}
+_PROJECT_CATEGORIES = {
+    'airport': ("Infraestrutura Aeroportuária", 0.9),
+}
+# Alternância única: o texto é percorrido uma vez, não uma vez por palavra-chave
+_PROJECT_KEYWORD_RE = re.compile('|'.join(
+    re.escape(keyword) for keyword in sorted(_PROJECT_KEYWORDS, key=len, reverse=True)
+))
+
+
+def _strip_accents(text: str) -> str:
+    """Remove acentos para que 'Aeroporto' e 'aeropórto' casem com a mesma palavra-chave"""
+    if text.isascii():
+        return text
+    return ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_neo4j_driver(uri: str, user: str, password: str):
+    """Driver compartilhado pelo processo (drivers Neo4j são thread-safe e de longa duração)"""
+    driver = GraphDatabase.driver(uri, auth=(user, password))
+    atexit.register(driver.close)
+    return driver
+
+
+def _dataset_fingerprint(driver) -> tuple:
+    """Impressão digital barata do dataset (contagens vindas do count store, O(1))"""
+    with driver.session() as session:
+        record = session.run("""
+            CALL { MATCH (n) RETURN count(n) AS nodes }
+            CALL { MATCH ()-[r]->() RETURN count(r) AS relationships }
+            RETURN nodes, relationships
+        """).single()
+    return (record['nodes'], record['relationships']) if record else (0, 0)
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_comprehensive_data(driver, fingerprint: tuple) -> Dict[str, Any]:
+    """Dados do projeto memoizados por driver e impressão digital do dataset"""
+    return _query_comprehensive_data(driver)
+
+
+def invalidate_analysis_cache() -> None:
+    """Descarta análises memoizadas (chamado quando os dados do Neo4j são apagados)"""
+    _cached_comprehensive_data.cache_clear()
+
+
+def _empty_project_data() -> Dict[str, Any]:
+    """Dados vazios usados quando o Neo4j não responde"""
+    return {
+        'statistics': [],
+        'project_info': [],
+        'technical_elements': {'walls': 0, 'features': 0, 'blocks': 0, 'annotations': 0},
+        'annotation_samples': []
+    }
+
+
+def _query_comprehensive_data(driver) -> Dict[str, Any]:
+    """Coleta dados básicos do Neo4j para análise (uma única ida ao banco)"""
+    
+    data = _empty_project_data()
+    
+    # Subqueries independentes; cada CALL agregado devolve exatamente uma linha
+    with driver.session() as session:
+        record = session.run("""
+            CALL {
+                MATCH (n)
+                WITH labels(n) AS type, count(n) AS count
+                ORDER BY count DESC
+                RETURN collect({type: type, count: count}) AS statistics
+            }
+            CALL {
+                MATCH (a:Annotation)
+                WHERE a.text CONTAINS 'ESCALA' OR a.text CONTAINS 'AEROPORTO' OR a.text CONTAINS 'PROJETO'
+                WITH a LIMIT 10
+                RETURN collect({info: a.text, layer: a.layer}) AS project_info
+            }
+            CALL { MATCH (w:WallSegment) RETURN count(w) AS walls }
+            CALL { MATCH (f:Feature) RETURN count(f) AS features }
+            CALL { MATCH (b:BlockReference) RETURN count(b) AS blocks }
+            CALL { MATCH (a:Annotation) RETURN count(a) AS annotations }
+            CALL {
+                MATCH (a:Annotation)
+                WHERE a.text IS NOT NULL AND size(a.text) > 5
+                WITH a LIMIT 15
+                RETURN collect({text: a.text, layer: a.layer}) AS annotation_samples
+            }
+            RETURN statistics, project_info, walls, features, blocks, annotations, annotation_samples
+        """).single()
+    
+    if record:
+        data['statistics'] = record['statistics']
+        data['project_info'] = record['project_info']
+        data['technical_elements'] = {
+            'walls': record['walls'],
+            'features': record['features'],
+            'blocks': record['blocks'],
+            'annotations': record['annotations']
+        }
+        data['annotation_samples'] = record['annotation_samples']
+    
+    return data
+
+
 @dataclass
 class ProjectInsight:
     """Estrutura para insights do projeto"""
@@ -40,11 +155,11 @@ class IntelligentProjectAnalyzer:
         openai.api_key = os.getenv("OPENAI_API_KEY")
         
     def _get_neo4j_driver(self):
-        """Conecta ao Neo4j"""
+        """Conecta ao Neo4j reutilizando o driver compartilhado"""
         uri = os.getenv("NEO4J_URI", "bolt://host.docker.internal:7687")
         user = os.getenv("NEO4J_USER", "neo4j")
         password = os.getenv("NEO4J_PASSWORD", "password123")
-        return GraphDatabase.driver(uri, auth=(user, password))
+        return _shared_neo4j_driver(uri, user, password)
     
     def analyze_complete_project(self) -> ProjectAnalysis:
         """Análise completa e inteligente do projeto"""
@@ -54,6 +169,13 @@ class IntelligentProjectAnalyzer:
         # 1. Coleta de dados estruturados
         raw_data = self._collect_comprehensive_data()
         
+        # Totais derivados calculados uma única vez e reaproveitados abaixo
+        stats = raw_data.get('statistics', [])
+        raw_data['_derived'] = {
+            'total_elements': sum(item['count'] for item in stats),
+            'node_type_count': len(stats)
+        }
+        
         # 2. Análise com IA contextual
         ai_analysis = self._analyze_with_ai(raw_data)
         
@@ -67,64 +189,15 @@ class IntelligentProjectAnalyzer:
         return analysis
     
     def _collect_comprehensive_data(self) -> Dict[str, Any]:
-        """Coleta dados básicos do Neo4j para análise (versão simplificada para estabilidade)"""
-        
-        with self.neo4j_driver.session() as session:
-            data = {}
-            
-            try:
-                # Estatísticas gerais (query básica)
-                data['statistics'] = session.run("""
-                    MATCH (n) 
-                    RETURN labels(n) as type, count(n) as count 
-                    ORDER BY count DESC
-                """).data()
-            except Exception as e:
-                print(f"[IA_ERROR] Statistics query failed: {e}")
-                data['statistics'] = []
-            
-            try:
-                # Informações do projeto (query simplificada)
-                data['project_info'] = session.run("""
-                    MATCH (a:Annotation) 
-                    WHERE a.text CONTAINS 'ESCALA' OR a.text CONTAINS 'AEROPORTO' OR a.text CONTAINS 'PROJETO'
-                    RETURN a.text as info, a.layer as layer
-                    LIMIT 10
-                """).data()
-            except Exception as e:
-                print(f"[IA_ERROR] Project info query failed: {e}")
-                data['project_info'] = []
-            
-            try:
-                # Elementos técnicos (queries básicas individuais)
-                walls_result = session.run("MATCH (w:WallSegment) RETURN count(w) as count").single()
-                features_result = session.run("MATCH (f:Feature) RETURN count(f) as count").single()
-                blocks_result = session.run("MATCH (b:BlockReference) RETURN count(b) as count").single()
-                annotations_result = session.run("MATCH (a:Annotation) RETURN count(a) as count").single()
-                
-                data['technical_elements'] = {
-                    'walls': walls_result['count'] if walls_result else 0,
-                    'features': features_result['count'] if features_result else 0,
-                    'blocks': blocks_result['count'] if blocks_result else 0,
-                    'annotations': annotations_result['count'] if annotations_result else 0
-                }
-            except Exception as e:
-                print(f"[IA_ERROR] Technical elements query failed: {e}")
-                data['technical_elements'] = {'walls': 0, 'features': 0, 'blocks': 0, 'annotations': 0}
-            
-            try:
-                # Amostras de anotações (query básica)
-                data['annotation_samples'] = session.run("""
-                    MATCH (a:Annotation) 
-                    WHERE a.text IS NOT NULL AND size(a.text) > 5
-                    RETURN a.text as text, a.layer as layer
-                    LIMIT 15
-                """).data()
-            except Exception as e:
-                print(f"[IA_ERROR] Annotation samples query failed: {e}")
-                data['annotation_samples'] = []
-            
-        return data
+        """Coleta dados do Neo4j, reaproveitando o resultado enquanto o dataset não mudar"""
+        try:
+            fingerprint = _dataset_fingerprint(self.neo4j_driver)
+            # Cópia rasa: quem chama pode anotar o dicionário sem alterar o cache
+            return dict(_cached_comprehensive_data(self.neo4j_driver, fingerprint))
+        except Exception as e:
+            # Falhas não entram no cache: a próxima análise tenta de novo
+            print(f"[IA_ERROR] Project data query failed: {e}")
+            return _empty_project_data()
     
     def _analyze_with_ai(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Análise contextual (sempre usa fallback para estabilidade)"""
@@ -176,9 +249,11 @@ class IntelligentProjectAnalyzer:
     def _fallback_analysis(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Análise de fallback baseada em heurísticas"""
         
-        # Análise heurística simples
-        annotations = [item['text'].lower() for item in raw_data.get('annotation_samples', [])]
-        project_info = [item['info'].lower() for item in raw_data.get('project_info', [])]
+        # Análise heurística simples: um único texto, convertido para minúsculas uma só vez
+        text_content = " ".join(itertools.chain(
+            (item['text'] for item in raw_data.get('annotation_samples', ())),
+            (item['info'] for item in raw_data.get('project_info', ()))
+        )).lower()
         
         analysis = {
             "project_type": "Desconhecido",
@@ -186,12 +261,15 @@ class IntelligentProjectAnalyzer:
             "confidence": 0.6
         }
         
-        # Detecção de tipo por palavras-chave
-        text_content = " ".join(annotations + project_info)
+        # Detecção de tipo por palavras-chave (uma única passada sobre o texto)
+        text_content = _strip_accents(text_content)
         
-        if any(term in text_content for term in ['aeroporto', 'airport', 'sbbi']):
-            analysis["project_type"] = "Infraestrutura Aeroportuária"
-            analysis["confidence"] = 0.9
+        matched = {_PROJECT_KEYWORDS[m.group(0)] for m in _PROJECT_KEYWORD_RE.finditer(text_content)}
+        for category, (project_type, confidence) in _PROJECT_CATEGORIES.items():
+            if category in matched:
+                analysis["project_type"] = project_type
+                analysis["confidence"] = confidence
+                break
             
         return analysis
     
@@ -214,7 +292,7 @@ class IntelligentProjectAnalyzer:
                 break
         
         # Insight sobre complexidade
-        total_elements = sum(item['count'] for item in raw_data.get('statistics', []))
+        total_elements = raw_data['_derived']['total_elements']
         if total_elements > 1000:
             complexity = "Alta"
             conf = 0.9
@@ -264,8 +342,8 @@ class IntelligentProjectAnalyzer:
         
         # Estatísticas
         statistics = {
-            'total_nodes': sum(item['count'] for item in raw_data.get('statistics', [])),
-            'node_types': len(raw_data.get('statistics', [])),
+            'total_nodes': raw_data['_derived']['total_elements'],
+            'node_types': raw_data['_derived']['node_type_count'],
             'layers_identified': len(raw_data.get('layer_analysis', [])),
             'annotations_count': raw_data.get('technical_elements', {}).get('annotations', 0)
         }
@@ -305,9 +383,8 @@ class IntelligentProjectAnalyzer:
         return " • ".join(summary_parts)
 
     def close(self):
-        """Fecha conexões"""
-        if self.neo4j_driver:
-            self.neo4j_driver.close()
+        """Libera a referência ao driver (o driver compartilhado é fechado na saída do processo)"""
+        self.neo4j_driver = None
 
 
 # Função de conveniência para uso no query_interface
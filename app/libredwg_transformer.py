@@ -11,13 +11,73 @@ Solves:
 """
 
 import json
-from typing import Dict, Any, List, Union, Optional
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, Union, Optional, BinaryIO
 from decimal import Decimal
 from dataclasses import dataclass
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# orjson parses JSON text/bytes in Rust with SIMD; the stdlib loop below is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson lets transform_stream() walk OBJECTS one entity at a time
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# pyarrow is only needed for transform_to_arrow()
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Point arrays longer than this are converted/rounded as one NumPy array instead of per scalar
+VECTORIZE_MIN_POINTS = 8
+
+# OBJECTS lists at least this long are transformed in worker processes; shorter
+# ones don't amortize the process start-up and pickling cost
+PARALLEL_MIN_OBJECTS = 20000
+
+# Worker processes for large OBJECTS lists (1 disables the process pool)
+TRANSFORM_MAX_WORKERS = int(os.getenv("TRANSFORMER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Stat counter slots, in transformation_stats order (summed across worker processes)
+_COUNTER_SLOTS = ('_n_coords', '_n_decimals', '_n_arrays', '_n_nulls', '_n_maps', '_n_complex')
+
+# Entity fields that hold points/point lists and go through _transform_coordinates
+_COORDINATE_FIELDS = frozenset(("start", "end", "center", "insertion_pt", "ins_pt", "points"))
+
+# Enum-like entity fields whose string values repeat across the whole drawing;
+# they are interned so every entity on a layer shares one str object
+_INTERN_FIELDS = frozenset(("object", "entity", "type", "dxfname", "layer", "linetype", "ltype",
+                            "color", "lineweight", "style"))
+
+# Keys whose nested dict/list values are known to need flattening (from DWG analysis)
+_PROBLEMATIC_KEYS = frozenset(("items", "color", "rgb", "index"))
+
+
+def _has_dict_item(items: List[Any]) -> bool:
+    """True if any element of the list is a dict"""
+    for item in items:
+        if isinstance(item, dict):
+            return True
+    return False
+
+
+def _pass_through(value: Any) -> Any:
+    """Handler for value types that are stored unchanged"""
+    return value
+
 
 @dataclass
 class TransformationConfig:
@@ -38,42 +98,76 @@ class LibreDWGTransformer:
     required to make LibreDWG output compatible with Neo4j storage.
     """
     
+    # Stats live in plain slot counters: a bump is one attribute store instead of
+    # a dict getitem/setitem; the stats dict is only assembled when read
+    __slots__ = (
+        'config', '_flat_key_cache', '_value_handlers',
+        '_n_coords', '_n_decimals', '_n_arrays', '_n_nulls', '_n_maps', '_n_complex', '_errors',
+    )
+    
+    # Flattened-key sanitization ('.' and ' ' -> '_') in a single pass
+    _SANITIZE = str.maketrans({'.': '_', ' ': '_'})
+    
     def __init__(self, config: Optional[TransformationConfig] = None):
         self.config = config or TransformationConfig()
-        self.transformation_stats = {
-            "coordinates_transformed": 0,
-            "decimals_converted": 0,
-            "arrays_flattened": 0,
-            "nulls_removed": 0,
-            "maps_flattened": 0,
-            "complex_dicts_flattened": 0,
-            "errors": []
+        # field -> coord -> interned "field_coord" key, shared by every entity's flattened dict
+        self._flat_key_cache: Dict[Any, Dict[Any, str]] = {}
+        # Exact type -> handler, seeded with the types a JSON parser produces; other
+        # types (Vec3, Map{}, subclasses) are added by _classify_value_type on first sight
+        self._value_handlers = {
+            dict: self._transform_dict,
+            list: self._transform_list,
+            str: self._normalize_string,
+            bytes: self._normalize_string,
+            int: self._convert_numeric,
+            float: self._convert_numeric,
+            bool: self._convert_numeric,
+            Decimal: self._transform_decimal,
+        }
+        self._reset_stats()
+    
+    def _reset_stats(self) -> None:
+        """Zero the transformation counters"""
+        self._n_coords = 0
+        self._n_decimals = 0
+        self._n_arrays = 0
+        self._n_nulls = 0
+        self._n_maps = 0
+        self._n_complex = 0
+        self._errors = []
+    
+    @property
+    def transformation_stats(self) -> Dict[str, Any]:
+        """Transformation counters as a dict (built on demand)"""
+        return {
+            "coordinates_transformed": self._n_coords,
+            "decimals_converted": self._n_decimals,
+            "arrays_flattened": self._n_arrays,
+            "nulls_removed": self._n_nulls,
+            "maps_flattened": self._n_maps,
+            "complex_dicts_flattened": self._n_complex,
+            "errors": self._errors
         }
     
-    def transform(self, libredwg_data: Union[Dict, List, str]) -> Dict[str, Any]:
+    def transform(self, libredwg_data: Union[Dict, List, str, bytes]) -> Dict[str, Any]:
         """
         Main transformation entry point.
         
         Args:
-            libredwg_data: Raw LibreDWG JSON data (dict, list, or JSON string)
+            libredwg_data: Raw LibreDWG JSON data (dict, list, or JSON string/bytes)
             
         Returns:
             Transformed data ready for Neo4j
+        
+        The whole document and its transformed copy are held in memory; for
+        large DWG exports prefer ``transform_stream``.
         """
-        # Handle JSON string input
-        if isinstance(libredwg_data, str):
+        # Handle JSON text input (bytes are parsed without decoding them first)
+        if isinstance(libredwg_data, (str, bytes, bytearray)):
             libredwg_data = self._parse_json_safely(libredwg_data)
         
         # Reset stats for this transformation
-        self.transformation_stats = {
-            "coordinates_transformed": 0,
-            "decimals_converted": 0,
-            "arrays_flattened": 0,
-            "nulls_removed": 0,
-            "maps_flattened": 0,
-            "complex_dicts_flattened": 0,
-            "errors": []
-        }
+        self._reset_stats()
         
         # Transform the data
         if isinstance(libredwg_data, dict):
@@ -92,18 +186,27 @@ class LibreDWGTransformer:
         else:
             raise ValueError(f"Unexpected data type: {type(libredwg_data)}")
     
-    def _parse_json_safely(self, json_str: str) -> Any:
-        """Parse JSON with multiple encoding attempts"""
-        # Try different encodings
-        for encoding in ['utf-8', 'latin-1', 'cp1252', 'utf-8-sig']:
+    def _parse_json_safely(self, json_str: Union[str, bytes]) -> Any:
+        """Parse JSON with orjson straight from the raw text/bytes, decoding only on fallback"""
+        if orjson is not None:
             try:
-                if isinstance(json_str, bytes):
-                    json_str = json_str.decode(encoding)
-                return json.loads(json_str)
-            except (UnicodeDecodeError, json.JSONDecodeError):
-                continue
+                return orjson.loads(json_str)
+            except orjson.JSONDecodeError:
+                # Non-UTF-8 bytes, BOM, NaN, ...: let the tolerant stdlib path handle it
+                pass
         
-        raise ValueError("Could not parse JSON with any supported encoding")
+        # Decode once: UTF-8 (BOM stripped if present), else latin-1, which
+        # accepts any byte sequence
+        if isinstance(json_str, (bytes, bytearray)):
+            try:
+                json_str = json_str.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                json_str = json_str.decode('latin-1')
+        
+        try:
+            return json.loads(json_str)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Could not parse JSON: {e}") from e
     
     def _transform_libredwg_format(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Transform standard LibreDWG JSON format"""
@@ -119,49 +222,218 @@ class LibreDWGTransformer:
         """Transform HEADER section"""
         return self._transform_value(header)
     
-    def _transform_objects(self, objects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Transform OBJECTS section"""
-        transformed_objects = []
+    def transform_stream(self, fileobj: BinaryIO) -> Iterator[Dict[str, Any]]:
+        """
+        Stream-transform the OBJECTS of a LibreDWG JSON file.
         
+        Args:
+            fileobj: LibreDWG JSON file opened in binary mode
+            
+        Returns:
+            Iterator of transformed entities; only one entity is parsed and
+            held in memory at a time. Stats accumulate as it is consumed.
+        """
+        if ijson is None:
+            raise ImportError("ijson package required for streaming. Install with: pip install ijson")
+        
+        self._reset_stats()
+        return self.iter_objects(ijson.items(fileobj, 'OBJECTS.item', use_float=True))
+    
+    def transform_to_arrow(self, libredwg_data: Union[Dict, List, str, bytes]) -> Dict[str, Any]:
+        """
+        Transform LibreDWG data into one Arrow RecordBatch per entity type.
+        
+        Args:
+            libredwg_data: LibreDWG document with HEADER and OBJECTS, or a list of
+                entities (as a dict/list or JSON string/bytes)
+            
+        Returns:
+            Dict of entity type -> ``pyarrow.RecordBatch``. Columns are typed
+            Arrow arrays (numeric columns are int64/float64 buffers); enum-like string
+            columns (layer, object, ...) are dictionary-encoded, and columns whose
+            values don't share one Arrow type are stored as JSON text.
+        
+        Entities are transformed one at a time and their values appended straight
+        to per-type column lists, so no list of transformed entity dicts is ever
+        built; the parsed input document itself is still held in memory.
+        """
+        if pa is None:
+            raise ImportError("pyarrow package required for Arrow output. Install with: pip install pyarrow")
+        
+        if isinstance(libredwg_data, (str, bytes, bytearray)):
+            libredwg_data = self._parse_json_safely(libredwg_data)
+        self._reset_stats()
+        
+        if isinstance(libredwg_data, dict) and "HEADER" in libredwg_data and "OBJECTS" in libredwg_data:
+            entities = self.iter_objects(libredwg_data["OBJECTS"])
+        elif isinstance(libredwg_data, list):
+            entities = (self._transform_value(item) for item in libredwg_data)
+        else:
+            raise ValueError("Arrow output needs a LibreDWG document with HEADER and OBJECTS "
+                             f"or a list of entities, got {type(libredwg_data).__name__}")
+        
+        # entity type -> (row count, column name -> values); partitioning by type keeps
+        # each batch's column set mostly uniform
+        partitions: Dict[str, Tuple[List[int], Dict[str, List[Any]]]] = {}
+        for entity in entities:
+            if not isinstance(entity, dict):
+                self._errors.append({
+                    "object": "UNKNOWN",
+                    "error": f"Expected entity dict, got {type(entity).__name__}"
+                })
+                continue
+            entity_type = str(entity.get("object", entity.get("type", "UNKNOWN")))
+            partition = partitions.get(entity_type)
+            if partition is None:
+                partition = partitions[entity_type] = ([0], {})
+            row_count, columns = partition
+            rows = row_count[0]
+            for name, value in entity.items():
+                column = columns.get(name)
+                if column is None:
+                    # Column first seen in this row: earlier rows of the type lack it
+                    column = columns[name] = [None] * rows
+                column.append(value)
+            row_count[0] = rows = rows + 1
+            for column in columns.values():
+                if len(column) < rows:
+                    column.append(None)
+        
+        batches = {}
+        for entity_type, (_, columns) in partitions.items():
+            names = list(columns)
+            arrays = []
+            for name in names:
+                # Each column's Python values are released once its Arrow array exists
+                values = columns.pop(name)
+                try:
+                    array = pa.array(values)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    # Mixed-type column: keep it as JSON text
+                    array = pa.array([None if v is None else json.dumps(v, default=str) for v in values],
+                                     type=pa.string())
+                del values
+                if name in _INTERN_FIELDS and pa.types.is_string(array.type):
+                    array = array.dictionary_encode()
+                arrays.append(array)
+            batches[entity_type] = pa.RecordBatch.from_arrays(arrays, names=names)
+        
+        return batches
+    
+    def iter_objects(self, objects: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Transform OBJECTS lazily, one entity at a time (failures are recorded in the stats)"""
         for obj in objects:
+            # Validate up front: non-dict entries can't be transformed (nor reported via obj.get)
+            if not isinstance(obj, dict):
+                self._errors.append({
+                    "object": "UNKNOWN",
+                    "error": f"Expected entity dict, got {type(obj).__name__}"
+                })
+                continue
             try:
                 transformed_obj = self._transform_entity(obj)
-                transformed_objects.append(transformed_obj)
             except Exception as e:
-                self.transformation_stats["errors"].append({
+                self._errors.append({
                     "object": obj.get("object", "UNKNOWN"),
                     "error": str(e)
                 })
                 logger.error(f"Error transforming entity: {e}")
+                continue
+            yield transformed_obj
+    
+    def _transform_objects(self, objects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transform OBJECTS section"""
+        if TRANSFORM_MAX_WORKERS > 1 and len(objects) >= PARALLEL_MIN_OBJECTS:
+            return self._transform_objects_parallel(objects)
+        return list(self.iter_objects(objects))
+    
+    def _transform_objects_parallel(self, objects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Transform OBJECTS in contiguous slices across worker processes.
+        Entities are independent, so each worker runs its own transformer and
+        the per-worker stats are summed back into this one; order is preserved.
+        """
+        max_workers = TRANSFORM_MAX_WORKERS
+        slice_size = -(-len(objects) // max_workers)
+        slices = [objects[i:i + slice_size] for i in range(0, len(objects), slice_size)]
+        
+        transformed_objects = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for transformed, counters, errors in executor.map(
+                    _transform_objects_worker, [self.config] * len(slices), slices):
+                transformed_objects.extend(transformed)
+                for name, count in zip(_COUNTER_SLOTS, counters):
+                    setattr(self, name, getattr(self, name) + count)
+                self._errors.extend(errors)
         
         return transformed_objects
     
     def _transform_entity(self, entity: Dict[str, Any]) -> Dict[str, Any]:
         """Transform a single entity with special handling for CAD types"""
-        entity_type = entity.get("object", entity.get("type", "UNKNOWN"))
-        
         # Start with base transformation
         transformed = {}
         
+        # Loop invariants hoisted out of the per-field loop
+        flatten_coordinates = self.config.flatten_coordinates
+        coordinate_fields = _COORDINATE_FIELDS
+        intern_fields = _INTERN_FIELDS
+        transform_coordinates = self._transform_coordinates
+        transform_value = self._transform_value
+        point_components = self._point_components
+        
         for key, value in entity.items():
             # Special handling for coordinate fields
-            if key in ["start", "end", "center", "insertion_pt", "ins_pt", "points"]:
-                transformed_value = self._transform_coordinates(value, key)
+            if key in coordinate_fields:
+                if flatten_coordinates:
+                    # [x, y(, z)] goes straight to key_x/key_y/key_z without an interim dict
+                    point = point_components(value)
+                    if point is not None:
+                        flat_keys = self._flat_keys(key)
+                        transformed[flat_keys["x"]], transformed[flat_keys["y"]], transformed[flat_keys["z"]] = point
+                        continue
+                transformed_value = transform_coordinates(value, key)
             else:
-                transformed_value = self._transform_value(value)
+                transformed_value = transform_value(value)
+                if type(transformed_value) is str and key in intern_fields:
+                    transformed_value = sys.intern(transformed_value)
             
             # Handle flattening of coordinate dicts
-            if (self.config.flatten_coordinates and 
-                isinstance(transformed_value, dict) and 
-                all(k in transformed_value for k in ["x", "y"])):
+            if (flatten_coordinates and 
+                type(transformed_value) is dict and 
+                "x" in transformed_value and "y" in transformed_value):
                 # Flatten coordinates to entity level
+                flat_keys = self._flat_keys(key)
                 for coord, coord_value in transformed_value.items():
-                    transformed[f"{key}_{coord}"] = coord_value
+                    flat_key = flat_keys.get(coord)
+                    if flat_key is None:
+                        flat_key = flat_keys[coord] = sys.intern(f"{key}_{coord}")
+                    transformed[flat_key] = coord_value
             else:
                 transformed[key] = transformed_value
         
         return transformed
     
+    def _flat_keys(self, key: str) -> Dict[str, str]:
+        """Interned ``key_<coord>`` names for a coordinate field (extra coords are added on demand)"""
+        flat_keys = self._flat_key_cache.get(key)
+        if flat_keys is None:
+            flat_keys = self._flat_key_cache[key] = {
+                coord: sys.intern(f"{key}_{coord}") for coord in ("x", "y", "z")
+            }
+        return flat_keys
+    
+    def _point_components(self, coords: Any) -> Optional[Tuple[Any, Any, Any]]:
+        """Converted (x, y, z) of an ``[x, y(, z)]`` array (z defaults to 0.0), or None if not a point"""
+        if isinstance(coords, list) and len(coords) >= 2 and all(isinstance(c, (int, float, Decimal)) for c in coords[:3]):
+            self._n_coords += 1
+            convert_numeric = self._convert_numeric
+            return (
+                convert_numeric(coords[0]),
+                convert_numeric(coords[1]),
+                convert_numeric(coords[2]) if len(coords) >= 3 else 0.0,
+            )
+        return None
+    
     def _transform_coordinates(self, coords: Any, field_name: str) -> Any:
         """Transform coordinate data"""
         if coords is None:
@@ -169,79 +441,135 @@ class LibreDWGTransformer:
         
         # Handle array format [x, y] or [x, y, z]
         if isinstance(coords, list):
-            if len(coords) >= 2 and all(isinstance(c, (int, float, Decimal)) for c in coords[:3]):
-                self.transformation_stats["coordinates_transformed"] += 1
-                result = {
-                    "x": self._convert_numeric(coords[0]),
-                    "y": self._convert_numeric(coords[1])
-                }
-                if len(coords) >= 3:
-                    result["z"] = self._convert_numeric(coords[2])
-                else:
-                    result["z"] = 0.0
-                return result
+            point = self._point_components(coords)
+            if point is not None:
+                x, y, z = point
+                return {"x": x, "y": y, "z": z}
             # Handle array of coordinates (e.g., polyline points)
             elif all(isinstance(c, list) for c in coords):
+                if len(coords) > VECTORIZE_MIN_POINTS:
+                    points = self._transform_point_array(coords)
+                    if points is not None:
+                        return points
                 return [self._transform_coordinates(c, f"{field_name}[{i}]") 
                         for i, c in enumerate(coords)]
         
         # Already in dict format or other type
         return self._transform_value(coords)
     
+    def _transform_point_array(self, coords: List[List[Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Convert a long ``[[x, y(, z)], ...]`` array in one NumPy pass.
+        Returns None (caller falls back to per-point conversion) unless the rows
+        form a plain int/float matrix, e.g. when they are ragged or hold Decimals.
+        """
+        try:
+            arr = np.asarray(coords)
+        except (ValueError, TypeError):
+            return None
+        if arr.ndim != 2 or arr.shape[1] < 2 or arr.dtype.kind not in 'if':
+            return None
+        
+        if arr.dtype.kind == 'f':
+            arr = np.round(arr, self.config.max_coordinate_precision)
+        self._n_coords += len(coords)
+        if arr.shape[1] == 2:
+            return [{"x": x, "y": y, "z": 0.0} for x, y in arr.tolist()]
+        return [{"x": x, "y": y, "z": z} for x, y, z in arr[:, :3].tolist()]
+    
     def _transform_value(self, value: Any) -> Any:
         """Transform any value recursively"""
         if value is None:
             return None if not self.config.strip_null_values else None
         
+        # O(1) exact-type dispatch; types seen for the first time are classified once below
+        value_type = type(value)
+        handler = self._value_handlers.get(value_type)
+        if handler is None:
+            handler = self._value_handlers[value_type] = self._classify_value_type(value_type)
+        return handler(value)
+    
+    def _classify_value_type(self, value_type: type) -> Any:
+        """
+        Pick the handler for a type outside the JSON-native table (Vec3, Map{},
+        subclasses, ...). Every check depends on the type alone, so the result
+        is cached in ``_value_handlers`` and the class name is never re-inspected.
+        """
         # Handle Vec3 objects (from ezdxf library)
-        if hasattr(value, '__class__') and value.__class__.__name__ == 'Vec3':
-            # Convert Vec3 to coordinate dict
-            self.transformation_stats['coordinates_transformed'] += 1
-            return {
-                'x': float(value.x) if hasattr(value, 'x') else 0.0,
-                'y': float(value.y) if hasattr(value, 'y') else 0.0,
-                'z': float(value.z) if hasattr(value, 'z') else 0.0
-            }
+        if value_type.__name__ == 'Vec3':
+            return self._transform_vec3
         
         # Handle Map{} objects (LibreDWG complex structures) - CRITICAL FIX
-        if hasattr(value, '__class__') and 'Map' in str(type(value)):
-            return self._flatten_map_object(value)
+        if 'Map' in str(value_type):
+            return self._flatten_map_object
         
         # Handle Decimal
-        if isinstance(value, Decimal):
-            self.transformation_stats["decimals_converted"] += 1
-            return self._convert_numeric(value)
+        if issubclass(value_type, Decimal):
+            return self._transform_decimal
         
         # Handle dict
-        if isinstance(value, dict):
-            # Check for problematic nested structures before transformation
-            if self._is_complex_nested_dict(value):
-                return self._flatten_complex_dict(value)
-            
-            transformed = {}
-            for k, v in value.items():
-                transformed_v = self._transform_value(v)
-                if transformed_v is not None or not self.config.strip_null_values:
-                    transformed[k] = transformed_v
-            return transformed
+        if issubclass(value_type, dict):
+            return self._transform_dict
         
         # Handle list
-        if isinstance(value, list):
-            return [self._transform_value(item) for item in value]
+        if issubclass(value_type, list):
+            return self._transform_list
         
         # Handle numeric types
-        if isinstance(value, (int, float)):
-            return self._convert_numeric(value)
+        if issubclass(value_type, (int, float)):
+            return self._convert_numeric
         
         # Handle strings (ensure UTF-8)
-        if isinstance(value, (str, bytes)):
-            return self._normalize_string(value)
+        if issubclass(value_type, (str, bytes)):
+            return self._normalize_string
         
         # Pass through other types
-        return value
+        return _pass_through
+    
+    def _transform_vec3(self, value: Any) -> Dict[str, float]:
+        """Convert an ezdxf Vec3 to a coordinate dict"""
+        self._n_coords += 1
+        return {
+            'x': float(value.x) if hasattr(value, 'x') else 0.0,
+            'y': float(value.y) if hasattr(value, 'y') else 0.0,
+            'z': float(value.z) if hasattr(value, 'z') else 0.0
+        }
+    
+    def _transform_dict(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        """Transform a dict, flattening problematic nested structures"""
+        # Check for problematic nested structures before transformation
+        if self._is_complex_nested_dict(value):
+            return self._flatten_complex_dict(value)
+        
+        transformed = {}
+        for k, v in value.items():
+            transformed_v = self._transform_value(v)
+            if transformed_v is not None or not self.config.strip_null_values:
+                transformed[k] = transformed_v
+        return transformed
+    
+    def _transform_list(self, value: List[Any]) -> List[Any]:
+        """Transform every item of a list"""
+        # Long float columns (spline knots/weights, bulges, ...) are rounded in one NumPy call
+        if (len(value) > VECTORIZE_MIN_POINTS and type(value[0]) is float and
+                all(type(item) is float for item in value)):
+            return np.round(np.array(value), self.config.max_coordinate_precision).tolist()
+        return [self._transform_value(item) for item in value]
+    
+    def _transform_decimal(self, value: Decimal) -> Union[int, float]:
+        """Convert a Decimal, counting it in the stats"""
+        self._n_decimals += 1
+        return self._convert_numeric(value)
     
     def _convert_numeric(self, value: Union[int, float, Decimal]) -> Union[int, float]:
         """Convert numeric value to Neo4j-compatible type"""
+        # Exact-type fast paths for the JSON-parsed common case (no isinstance/MRO walk)
+        value_type = type(value)
+        if value_type is float:
+            return round(value, self.config.max_coordinate_precision)
+        if value_type is int:
+            return value
+        
         if isinstance(value, Decimal):
             # Convert Decimal to float
             float_val = float(value)
@@ -258,14 +586,11 @@ class LibreDWGTransformer:
     def _normalize_string(self, value: Union[str, bytes]) -> str:
         """Normalize string encoding to UTF-8"""
         if isinstance(value, bytes):
-            # Try to decode bytes
-            for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                try:
-                    return value.decode(encoding)
-                except UnicodeDecodeError:
-                    continue
-            # Fallback to lossy decode
-            return value.decode('utf-8', errors='replace')
+            try:
+                return value.decode('utf-8')
+            except UnicodeDecodeError:
+                # latin-1 maps every byte, so no further fallback is ever reached
+                return value.decode('latin-1')
         return value
     
     def _flatten_map_object(self, map_obj: Any) -> Union[str, Dict[str, Any]]:
@@ -273,7 +598,7 @@ class LibreDWGTransformer:
         Flatten LibreDWG Map{} objects to Neo4j-compatible format.
         Based on official LibreDWG documentation and Neo4j property restrictions.
         """
-        self.transformation_stats["maps_flattened"] += 1
+        self._n_maps += 1
         
         try:
             # If it has key-value access, try to extract as dict
@@ -295,7 +620,7 @@ class LibreDWGTransformer:
                 if hasattr(map_obj, 'items'):
                     try:
                         for key, value in map_obj.items():
-                            safe_key = str(key).replace('.', '_').replace(' ', '_')
+                            safe_key = str(key).translate(LibreDWGTransformer._SANITIZE)
                             flattened[safe_key] = self._transform_value(value)
                     except (TypeError, AttributeError):
                         pass
@@ -315,70 +640,96 @@ class LibreDWGTransformer:
         Enhanced to catch ANY nested dict/list combinations that could cause Map{} errors.
         """
         # Check for known problematic patterns from DWG analysis
-        problematic_keys = ['items', 'color', 'rgb', 'index']
-        
-        for key in problematic_keys:
-            if key in value:
-                nested_value = value[key]
-                # If it's a dict with multiple nested levels or complex objects
-                if isinstance(nested_value, dict) and len(nested_value) > 0:
+        for key in _PROBLEMATIC_KEYS.intersection(value):
+            nested_value = value[key]
+            # If it's a dict with multiple nested levels or complex objects
+            if isinstance(nested_value, dict):
+                if nested_value:
                     return True
-                # If it's a list with dict elements
-                if isinstance(nested_value, list) and len(nested_value) > 0:
-                    if any(isinstance(item, dict) for item in nested_value):
-                        return True
+            # If it's a list with dict elements
+            elif isinstance(nested_value, list) and _has_dict_item(nested_value):
+                return True
         
         # Additional check: Only specific nested dict patterns need flattening
         # Don't flatten node dictionaries that are already processed by graph_loader
         if 'label' in value and 'uid' in value:
             # This is likely a processed node, don't flatten unless it has specific problematic patterns
             return False
-            
-        for key, nested_value in value.items():
-            if isinstance(nested_value, dict) and len(nested_value) > 1:
-                # Only flatten dicts with multiple properties that could cause Map{} issues
-                return True
-            if isinstance(nested_value, list) and any(isinstance(item, dict) for item in nested_value):
-                return True
         
-        return False
+        # Only flatten dicts with multiple properties (or lists of dicts) that could cause Map{} issues
+        return any(
+            (len(nested_value) > 1) if isinstance(nested_value, dict)
+            else (isinstance(nested_value, list) and _has_dict_item(nested_value))
+            for nested_value in value.values()
+        )
     
     def _flatten_complex_dict(self, value: Dict[str, Any]) -> Dict[str, Any]:
         """
         Flatten complex nested dictionaries to prevent Map{} serialization errors.
         Follows Neo4j property naming conventions.
         """
-        self.transformation_stats["complex_dicts_flattened"] += 1
         flattened = {}
+        self._flatten_into(flattened, "", value)
+        return flattened
+    
+    def _flatten_into(self, flattened: Dict[str, Any], prefix: str, value: Dict[str, Any]) -> None:
+        """
+        Flatten ``value`` into ``flattened``, prefixing every key with ``prefix``.
+        Nested complex dicts are written straight into the same output in one
+        pass. The walk uses an explicit stack of (is_list, prefix, iterator)
+        frames instead of recursion, so key order matches a depth-first walk.
+        """
+        sanitize = LibreDWGTransformer._SANITIZE
+        transform_value = self._transform_value
         
-        for key, nested_value in value.items():
-            if isinstance(nested_value, dict):
-                # Flatten dict: color: {index: 7, rgb: 16777215} → color_index: 7, color_rgb: 16777215
-                for nested_key, nested_val in nested_value.items():
-                    safe_key = f"{key}_{nested_key}".replace('.', '_').replace(' ', '_')
-                    flattened[safe_key] = self._transform_value(nested_val)
-            elif isinstance(nested_value, list) and len(nested_value) > 0:
-                # Flatten list of dicts: items: [{type: "text"}, {type: "line"}] → items_0_type: "text", items_1_type: "line"
-                if all(isinstance(item, dict) for item in nested_value):
-                    for i, item_dict in enumerate(nested_value):
-                        # Recursively flatten each dict in the list
-                        if self._is_complex_nested_dict(item_dict):
-                            sub_flattened = self._flatten_complex_dict(item_dict)
-                            for sub_key, sub_val in sub_flattened.items():
-                                safe_key = f"{key}_{i}_{sub_key}".replace('.', '_').replace(' ', '_')
-                                flattened[safe_key] = sub_val
-                        else:
-                            for item_key, item_val in item_dict.items():
-                                safe_key = f"{key}_{i}_{item_key}".replace('.', '_').replace(' ', '_')
-                                flattened[safe_key] = self._transform_value(item_val)
-                else:
-                    # Simple list: keep as array
-                    flattened[key] = [self._transform_value(item) for item in nested_value]
-            else:
-                # Simple value: transform and keep
-                flattened[key] = self._transform_value(nested_value)
+        self._n_complex += 1
+        stack = [(False, prefix, iter(value.items()))]
         
-        return flattened
+        while stack:
+            is_list, prefix, items = stack[-1]
+            descended = False
+            
+            if is_list:
+                # Dicts of a list of dicts: items: [{type: "text"}, {type: "line"}] → items_0_type: "text", items_1_type: "line"
+                for i, item_dict in items:
+                    item_prefix = f"{prefix}{i}_"
+                    if self._is_complex_nested_dict(item_dict):
+                        # Flatten the dict's own items before moving on to the next one
+                        self._n_complex += 1
+                        stack.append((False, item_prefix, iter(item_dict.items())))
+                        descended = True
+                        break
+                    for item_key, item_val in item_dict.items():
+                        safe_key = f"{item_prefix}{item_key}".translate(sanitize)
+                        flattened[safe_key] = transform_value(item_val)
+            else:
+                for key, nested_value in items:
+                    if isinstance(nested_value, dict):
+                        # Flatten dict: color: {index: 7, rgb: 16777215} → color_index: 7, color_rgb: 16777215
+                        for nested_key, nested_val in nested_value.items():
+                            safe_key = f"{prefix}{key}_{nested_key}".translate(sanitize)
+                            flattened[safe_key] = transform_value(nested_val)
+                    elif isinstance(nested_value, list) and len(nested_value) > 0:
+                        if all(isinstance(item, dict) for item in nested_value):
+                            stack.append((True, f"{prefix}{key}_", iter(enumerate(nested_value))))
+                            descended = True
+                            break
+                        # Simple list: keep as array
+                        flattened[self._prefixed_key(prefix, key)] = [transform_value(item) for item in nested_value]
+                    else:
+                        # Simple value: transform and keep
+                        flattened[self._prefixed_key(prefix, key)] = transform_value(nested_value)
+            
+            if not descended:
+                # Frame exhausted
+                stack.pop()
+    
+    @staticmethod
+    def _prefixed_key(prefix: str, key: Any) -> Any:
+        """Top-level keys are kept verbatim; nested ones get the prefix and are sanitized"""
+        if not prefix:
+            return key
+        return f"{prefix}{key}".translate(LibreDWGTransformer._SANITIZE)
     
     def get_transformation_report(self) -> Dict[str, Any]:
         """Get detailed transformation statistics"""
@@ -393,8 +744,17 @@ class LibreDWGTransformer:
         }
 
 
+def _transform_objects_worker(config: TransformationConfig, objects: List[Dict[str, Any]]
+                              ) -> Tuple[List[Dict[str, Any]], Tuple[int, ...], List[Dict[str, Any]]]:
+    """Process-pool entry point: transform a slice of OBJECTS with a process-local transformer"""
+    transformer = LibreDWGTransformer(config)
+    transformed = list(transformer.iter_objects(objects))
+    counters = tuple(getattr(transformer, name) for name in _COUNTER_SLOTS)
+    return transformed, counters, transformer._errors
+
+
 # Convenience functions
-def transform_libredwg_json(json_data: Union[Dict, List, str], 
+def transform_libredwg_json(json_data: Union[Dict, List, str, bytes], 
                            config: Optional[TransformationConfig] = None) -> Dict[str, Any]:
     """
     Transform LibreDWG JSON data for Neo4j compatibility.
@@ -1,28 +1,73 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import BackgroundTasks, FastAPI, UploadFile, File, HTTPException, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
+import gc
+import hashlib
 import os
+import re
 import time
-from typing import Any, Dict, Optional, List
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
 import json
 from pathlib import Path
 import tempfile
+import threading
+import traceback
+import uuid
 from dotenv import load_dotenv
 
 from pydantic import BaseModel
 
+# orjson parses/serializes in Rust straight from/to bytes; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Carregar variáveis de ambiente do diretório pai
 load_dotenv(dotenv_path=Path(__file__).parent.parent / ".env")
 
 from query_interface import text_to_cypher, text_to_cypher_async, smart_query_router_async, execute_cypher_query, build_prompt  # noqa: F401
 from data_extraction import extract_cad_data
 from enhanced_data_extraction import enhanced_extract_cad_data, EnhancedCADExtractor
-from graph_loader import transform_to_graph, transform_to_graph_streaming, transform_enhanced_to_graph, load_to_neo4j
+from graph_loader import transform_to_graph, transform_to_graph_streaming, transform_enhanced_to_graph, load_to_neo4j, enhance_graph_with_ocr, TransformCancelled
 # ✅ REATIVADO: Imports OCR para enriquecimento de grafos
 from ocr_integration_endpoint import ocr_router
 from async_ocr_processor import async_ocr_router, get_async_processor
 
+# OpenAI is only needed for result summaries
+try:
+    from openai import AsyncOpenAI
+except ImportError:
+    AsyncOpenAI = None
+
+# Query helpers imported once here instead of inside every request handler
+try:
+    from semantic_query_enhancer import semantic_enhancer
+except ImportError:
+    semantic_enhancer = None
+
+try:
+    from intelligent_project_analyzer import IntelligentProjectAnalyzer
+except ImportError:
+    IntelligentProjectAnalyzer = None
+
+# One shared async client: its connection pool keeps the TLS session to the API warm across requests
+if AsyncOpenAI is not None and os.getenv("OPENAI_API_KEY"):
+    _openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+else:
+    _openai = None
+
+
+def _json_dumps_indented(value: Any) -> str:
+    """Pretty-printed JSON text (used to show query results to the LLM)."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value, indent=2)
+
+
 # Formatting functions for different query types
 def format_legend_response(primary_result, alternative_results):
     """Format response for legend queries with visual information when available."""
@@ -140,7 +185,6 @@ def format_legend_response(primary_result, alternative_results):
 
 def format_scale_response(primary_result, alternative_results=None):
     """Format response for scale queries."""
-    import re
     
     # First check alternative results for exact scale notations
     if alternative_results:
@@ -273,7 +317,11 @@ def format_generic_response(primary_result, alternative_results, intent):
     return f"ℹ️ **{result_count} resultado(s) encontrado(s)**"
 
 
-app = FastAPI(title="CAD Graph Platform")
+# Responses are serialized with orjson when it is installed (stdlib json otherwise)
+app = FastAPI(
+    title="CAD Graph Platform",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
 # Add CORS middleware to allow frontend access
 app.add_middleware(
@@ -285,6 +333,68 @@ app.add_middleware(
 )
 
 
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# CAD extraction is CPU-heavy and writes large temp files; past a few concurrent
+# uploads extra extractions only add context switching, so later ones wait their turn
+EXTRACT_MAX_CONCURRENCY = int(os.getenv("EXTRACT_MAX_CONCURRENCY", max(2, (os.cpu_count() or 2) // 2)))
+_EXTRACT_SEM = asyncio.Semaphore(EXTRACT_MAX_CONCURRENCY)
+
+
+def _copy_fd_range(src_fd: int, dst_fd: int, count: int) -> int:
+    """Copy ``count`` bytes between file descriptors inside the kernel."""
+    offset = 0
+    use_copy_file_range = hasattr(os, "copy_file_range")
+    while offset < count:
+        if use_copy_file_range:
+            try:
+                copied = os.copy_file_range(src_fd, dst_fd, count - offset, offset_src=offset)
+            except OSError:
+                # Older kernels / cross-filesystem copies: retry the rest with sendfile
+                if not hasattr(os, "sendfile"):
+                    raise
+                use_copy_file_range = False
+                continue
+        else:
+            copied = os.sendfile(dst_fd, src_fd, offset, count - offset)
+        if copied == 0:
+            break
+        offset += copied
+    return offset
+
+
+def _persist_spooled_upload(src: Any, file_path: Path, max_size: int) -> Optional[int]:
+    """Zero-copy save of an upload Starlette already spooled to a temp file on disk.
+
+    Returns the upload size (nothing is written when it exceeds ``max_size``), or
+    None when the upload is still held in memory, the platform lacks
+    copy_file_range/sendfile, or the kernel copy fails (e.g. unsupported by the
+    target filesystem); the caller then falls back to chunked writes.
+    """
+    if not getattr(src, "_rolled", False):
+        return None
+    if not (hasattr(os, "copy_file_range") or hasattr(os, "sendfile")):
+        return None
+
+    src.flush()
+    src_fd = src.fileno()
+    size = os.fstat(src_fd).st_size
+    if size > max_size:
+        return size
+    try:
+        with open(file_path, "wb") as dst:
+            copied = _copy_fd_range(src_fd, dst.fileno(), size)
+        if copied != size:
+            raise OSError(f"short copy: {copied} of {size} bytes")
+    except OSError as e:
+        print(f"[UPLOAD] Zero-copy save failed ({e}) - falling back to chunked writes")
+        file_path.unlink(missing_ok=True)
+        src.seek(0)
+        return None
+    return size
+
+
 class UploadResponse(BaseModel):
     message: str
     file_path: str
@@ -294,15 +404,32 @@ class UploadResponse(BaseModel):
     ocr_job_id: Optional[str] = None
 
 
+# Pre-encoded: health probes get a constant body, with no dict build or JSON encode per call
+_HEALTH_BODY = b'{"status":"ok"}'
+
+
 @app.get("/health")
 async def health_check():
     """Simple health check endpoint."""
-    return {"status": "ok"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
-@app.post("/api/upload", response_model=UploadResponse)
-async def upload_file(file: UploadFile = File(...)):
-    """Upload and process a CAD file (DWG/DXF)."""
+# Full JSON parse of the extractor output on upload; off by default because the
+# transform parses the file anyway and the sentinel check catches truncated output
+STRICT_UPLOAD_VALIDATE = os.getenv("STRICT_UPLOAD_VALIDATE", "0") == "1"
+
+
+def _json_sentinels_ok(json_path: Path) -> bool:
+    """Cheap shape check: the document opens with [ or { and closes with ] or }."""
+    with open(json_path, "rb") as f:
+        head = f.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+        f.seek(max(0, f.seek(0, os.SEEK_END) - 64))
+        tail = f.read().rstrip(b" \t\r\n")[-1:]
+    return (head, tail) in ((b"[", b"]"), (b"{", b"}"))
+
+
+async def _save_upload(file: UploadFile) -> Path:
+    """Validate an uploaded CAD file and persist it under uploads/."""
     
     # Validate file type
     if not file.filename:
@@ -313,259 +440,275 @@ async def upload_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Only DWG and DXF files are supported")
     
     # Validate file size - ETAPA 2: Removendo limite temporário para DWG
-    content = await file.read()
     max_size = 50 * 1024 * 1024  # 50MB para ambos DWG e DXF para teste ETAPA 2
-    if len(content) > max_size:
-        size_mb = len(content) / (1024 * 1024)
-        limit_mb = max_size / (1024 * 1024)
-        raise HTTPException(
-            status_code=413, 
-            detail=f"File size ({size_mb:.1f}MB) must be less than {limit_mb}MB for {file_ext.upper()} files"
-        )
-    
-    # Reset file pointer for subsequent operations
-    await file.seek(0)
     
     # Create uploads directory if it doesn't exist
     uploads_dir = Path("uploads")
     uploads_dir.mkdir(exist_ok=True)
     
-    # Save uploaded file
+    # Save uploaded file: large uploads are already spooled to a temp file, so copy it
+    # kernel-side; otherwise stream it to disk in chunks (size checked as bytes arrive)
+    # with the blocking writes off the event loop, instead of buffering it whole
     file_path = uploads_dir / file.filename
     try:
-        # Use the content we already read for validation
-        with open(file_path, "wb") as f:
-            f.write(content)
+        size = await asyncio.to_thread(_persist_spooled_upload, file.file, file_path, max_size)
+        if size is None:
+            size = 0
+            with open(file_path, "wb") as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
+                        break
+                    await asyncio.to_thread(f.write, chunk)
     except Exception as e:
+        file_path.unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
-    try:
-        # Extract CAD data with enhanced pipeline (including OCR analysis)
-        print(f"[UPLOAD] Starting CAD data extraction from: {file_path}")
-        print(f"[UPLOAD] File size: {file_path.stat().st_size} bytes")
-        print(f"[UPLOAD] File extension: {file_path.suffix.lower()}")
-        
-        # ✅ REATIVADO: Pipeline enhanced com OCR para enriquecimento de grafos
-        use_enhanced = True  # Habilitar enhanced para OCR e análise visual
-        # Força desabilitação do OCR no enhanced_data_extraction.py
-        # ✅ REATIVADO: Análise visual para detecção de cores e padrões
-        enable_visual_analysis = True  # os.getenv("ENABLE_VISUAL_ANALYSIS", "true").lower() == "true"
-        print(f"[UPLOAD] Enhanced OCR pipeline enabled: {use_enhanced}")
-        print(f"[UPLOAD] Visual analysis enabled: {enable_visual_analysis}")
-        
-        extraction_start_time = time.time()
-        
-        if use_enhanced:
-            # Use enhanced extraction with gap analysis AND visual analysis
-            print("[UPLOAD] Using enhanced extraction with OCR pipeline and visual analysis...")
-            enhanced_result = enhanced_extract_cad_data(
+    if size > max_size:
+        file_path.unlink(missing_ok=True)
+        size_mb = (file.size or size) / (1024 * 1024)
+        limit_mb = max_size / (1024 * 1024)
+        raise HTTPException(
+            status_code=413, 
+            detail=f"File size ({size_mb:.1f}MB) must be less than {limit_mb}MB for {file_ext.upper()} files"
+        )
+    
+    return file_path
+
+
+async def _process_upload(file_path: Path) -> UploadResponse:
+    """Extract, transform and load a saved CAD file into Neo4j."""
+    # Extract CAD data with enhanced pipeline (including OCR analysis)
+    print(f"[UPLOAD] Starting CAD data extraction from: {file_path}")
+    print(f"[UPLOAD] File size: {file_path.stat().st_size} bytes")
+    print(f"[UPLOAD] File extension: {file_path.suffix.lower()}")
+    
+    # ✅ REATIVADO: Pipeline enhanced com OCR para enriquecimento de grafos
+    use_enhanced = True  # Habilitar enhanced para OCR e análise visual
+    # Força desabilitação do OCR no enhanced_data_extraction.py
+    # ✅ REATIVADO: Análise visual para detecção de cores e padrões
+    enable_visual_analysis = True  # os.getenv("ENABLE_VISUAL_ANALYSIS", "true").lower() == "true"
+    print(f"[UPLOAD] Enhanced OCR pipeline enabled: {use_enhanced}")
+    print(f"[UPLOAD] Visual analysis enabled: {enable_visual_analysis}")
+    
+    if _EXTRACT_SEM.locked():
+        print(f"[UPLOAD] All {EXTRACT_MAX_CONCURRENCY} extraction slots busy - waiting...")
+    extraction_start_time = time.time()
+    
+    if use_enhanced:
+        # Use enhanced extraction with gap analysis AND visual analysis
+        print("[UPLOAD] Using enhanced extraction with OCR pipeline and visual analysis...")
+        # Blocking pipeline stages run in worker threads so the event loop keeps serving requests
+        async with _EXTRACT_SEM:
+            enhanced_result = await asyncio.to_thread(
+                enhanced_extract_cad_data,
                 file_path, 
                 enable_ocr=True,  # ✅ REATIVADO: OCR habilitado para enriquecimento
                 enable_visual_analysis=enable_visual_analysis
             )
-            print("[UPLOAD] Enhanced extraction completed successfully")
-            
-            # Get the traditional JSON path for backward compatibility
-            json_path = Path(enhanced_result["vector_data"]["json_path"])
-            
-            # Log enhanced extraction metrics
-            metrics = enhanced_result["extraction_metadata"]["metrics"]
-            print(f"[UPLOAD] Enhanced extraction completed:")
-            print(f"[UPLOAD]   - Vector entities: {metrics['extraction_stats']['vector_entities']}")
-            print(f"[UPLOAD]   - Suspicious regions: {metrics['extraction_stats']['suspicious_regions']}")
-            print(f"[UPLOAD]   - Rendered regions: {metrics['extraction_stats']['rendered_regions']}")
-            print(f"[UPLOAD]   - Total time: {metrics['timing']['total_time']:.2f}s")
-        else:
-            # Use traditional extraction
-            print("[UPLOAD] Using traditional extraction...")
-            json_path = extract_cad_data(file_path)
-            extraction_time = time.time() - extraction_start_time
-            print(f"[UPLOAD] Traditional JSON extracted to: {json_path} in {extraction_time:.2f}s")
-        
-        # Check if entities file exists (preferred format)
-        print(f"[UPLOAD] Checking for entities file...")
-        entities_path = json_path.parent / f"{json_path.stem}-entities.json"
-        if entities_path.exists():
-            print(f"[UPLOAD] Found entities file: {entities_path}")
-            json_path = entities_path
-        else:
-            print(f"[UPLOAD] No entities file found, using: {json_path}")
-        
-        # Check if JSON file exists and is readable
-        print(f"[UPLOAD] Verifying JSON file exists: {json_path}")
-        if not json_path.exists():
-            raise Exception(f"JSON extraction failed - output file not found: {json_path}")
-        
-        json_file_size = json_path.stat().st_size
-        print(f"[UPLOAD] JSON file size: {json_file_size} bytes")
-        
-        # Try to read the JSON file with multiple encodings
-        print(f"[UPLOAD] Reading JSON file...")
-        parse_start_time = time.time()
-        test_data = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252']:
-            try:
-                with open(json_path, 'r', encoding=encoding) as f:
-                    test_data = json.load(f)
-                parse_time = time.time() - parse_start_time
-                data_count = len(test_data) if isinstance(test_data, list) else 'object'
-                print(f"[UPLOAD] JSON file successfully parsed with {encoding} encoding in {parse_time:.2f}s, contains {data_count}")
-                break
-            except UnicodeDecodeError:
-                print(f"[UPLOAD] Failed to decode with {encoding}, trying next encoding")
-                continue
-            except json.JSONDecodeError as je:
-                raise Exception(f"JSON file format error: {je}")
-        
-        if test_data is None:
-            raise Exception("Could not read JSON file with any supported encoding")
+        print("[UPLOAD] Enhanced extraction completed successfully")
         
-        # Transform to graph format
-        print("[UPLOAD] Transforming to graph format...")
-        graph_start_time = time.time()
+        # Get the traditional JSON path for backward compatibility
+        json_path = Path(enhanced_result["vector_data"]["json_path"])
         
-        # Determine entity count efficiently (reuse already parsed data)
-        entities_count = len(test_data) if isinstance(test_data, list) else len(test_data.get('OBJECTS', []))
-        print(f"[UPLOAD] Entity count: {entities_count:,}")
+        # Log enhanced extraction metrics
+        metrics = enhanced_result["extraction_metadata"]["metrics"]
+        print(f"[UPLOAD] Enhanced extraction completed:")
+        print(f"[UPLOAD]   - Vector entities: {metrics['extraction_stats']['vector_entities']}")
+        print(f"[UPLOAD]   - Suspicious regions: {metrics['extraction_stats']['suspicious_regions']}")
+        print(f"[UPLOAD]   - Rendered regions: {metrics['extraction_stats']['rendered_regions']}")
+        print(f"[UPLOAD]   - Total time: {metrics['timing']['total_time']:.2f}s")
+    else:
+        # Use traditional extraction
+        print("[UPLOAD] Using traditional extraction...")
+        async with _EXTRACT_SEM:
+            json_path = await asyncio.to_thread(extract_cad_data, file_path)
+        extraction_time = time.time() - extraction_start_time
+        print(f"[UPLOAD] Traditional JSON extracted to: {json_path} in {extraction_time:.2f}s")
+    
+    # Check if entities file exists (preferred format)
+    print(f"[UPLOAD] Checking for entities file...")
+    entities_path = json_path.parent / f"{json_path.stem}-entities.json"
+    if entities_path.exists():
+        print(f"[UPLOAD] Found entities file: {entities_path}")
+        json_path = entities_path
+    else:
+        print(f"[UPLOAD] No entities file found, using: {json_path}")
+    
+    # Check if JSON file exists and is readable
+    print(f"[UPLOAD] Verifying JSON file exists: {json_path}")
+    if not json_path.exists():
+        raise Exception(f"JSON extraction failed - output file not found: {json_path}")
+    
+    json_file_size = json_path.stat().st_size
+    print(f"[UPLOAD] JSON file size: {json_file_size} bytes")
+    
+    if json_file_size == 0:
+        raise Exception(f"JSON extraction failed - output file is empty: {json_path}")
+    
+    if not _json_sentinels_ok(json_path):
+        raise Exception(f"JSON file format error (sentinel check): {json_path}")
+    if STRICT_UPLOAD_VALIDATE:
+        await asyncio.to_thread(lambda: json.loads(json_path.read_bytes()))
+    
+    # Transform to graph format (the transform reports how many entities it read,
+    # so the file isn't parsed here just to count them)
+    print("[UPLOAD] Transforming to graph format...")
+    graph_start_time = time.time()
+    
+    # The enhanced extraction already knows how many entities it extracted
+    extracted_count = len(enhanced_result["vector_data"]["entities"]) if use_enhanced else 0
+    print(f"[UPLOAD] Extracted entity count: {extracted_count:,}")
+    
+    # STREAMING PRIORITY: Use streaming for large files regardless of enhanced processing
+    if extracted_count > 5000:  # Aggressive threshold for better memory management
+        print(f"[UPLOAD] Large file detected ({extracted_count:,} entities) - using streaming transformation...")
+        # Smaller chunks for better memory control
+        chunk_size = 2000 if extracted_count > 20000 else 3000
         
-        # STREAMING PRIORITY: Use streaming for large files regardless of enhanced processing
-        if entities_count > 5000:  # Aggressive threshold for better memory management
-            print(f"[UPLOAD] Large file detected ({entities_count:,} entities) - using streaming transformation...")
-            # Smaller chunks for better memory control
-            chunk_size = 2000 if entities_count > 20000 else 3000
-            
-            # Add timeout protection
-            import signal
-            
-            def timeout_handler(signum, frame):
-                raise TimeoutError("[UPLOAD] Streaming transformation timeout after 120 seconds")
-            
-            # Set 2 minute timeout for streaming
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(120)
-            
+        # 2 minute timeout for streaming. The worker thread can't be interrupted, so on
+        # timeout it is told to stop between chunks and the fallback only starts once it
+        # has: the two transforms never run (and hold memory) at the same time
+        cancel_event = threading.Event()
+        streaming = asyncio.ensure_future(asyncio.to_thread(
+            transform_to_graph_streaming, json_path, chunk_size=chunk_size,
+            return_counts=True, cancel_event=cancel_event,
+        ))
+        try:
+            graph_payload, entities_count = await asyncio.wait_for(asyncio.shield(streaming), timeout=120)
+        except asyncio.TimeoutError:
+            print("[UPLOAD] Streaming transformation timeout after 120 seconds - stopping it...")
+            cancel_event.set()
             try:
-                graph_payload = transform_to_graph_streaming(json_path, chunk_size=chunk_size)
-                signal.alarm(0)  # Cancel timeout
-            except TimeoutError as e:
-                print(f"[UPLOAD] {e}")
+                # Finished before it saw the flag: keep its result
+                graph_payload, entities_count = await streaming
+            except TransformCancelled:
                 print("[UPLOAD] Falling back to traditional transformation...")
-                graph_payload = transform_to_graph(json_path)
-                signal.alarm(0)  # Cancel timeout
-        # Use enhanced transformation if we have enhanced data with visual analysis
-        elif use_enhanced and 'enhanced_result' in locals() and enhanced_result.get('visual_nodes'):
-            print("[UPLOAD] Using enhanced transformation with visual data...")
-            graph_payload = transform_enhanced_to_graph(enhanced_result)
-        else:
-            print(f"[UPLOAD] Using traditional transformation for {entities_count:,} entities...")
-            graph_payload = transform_to_graph(json_path)
-        
-        graph_time = time.time() - graph_start_time
-        print(f"[UPLOAD] Graph payload created with {len(graph_payload.get('nodes', []))} nodes in {graph_time:.2f}s")
-        
-        # Force garbage collection after transformation
-        import gc
-        gc.collect()
-        print("[UPLOAD] Memory cleanup performed after transformation")
+                graph_payload, entities_count = await asyncio.to_thread(transform_to_graph, json_path, return_counts=True)
+    # Use enhanced transformation if we have enhanced data with visual analysis
+    elif use_enhanced and 'enhanced_result' in locals() and enhanced_result.get('visual_nodes'):
+        print("[UPLOAD] Using enhanced transformation with visual data...")
+        graph_payload = await asyncio.to_thread(transform_enhanced_to_graph, enhanced_result)
+        entities_count = extracted_count
+    else:
+        # Large files are still streamed inside transform_to_graph (by file size)
+        print("[UPLOAD] Using traditional transformation...")
+        graph_payload, entities_count = await asyncio.to_thread(transform_to_graph, json_path, return_counts=True)
+    print(f"[UPLOAD] Entity count: {entities_count:,}")
+    
+    graph_time = time.time() - graph_start_time
+    print(f"[UPLOAD] Graph payload created with {len(graph_payload.get('nodes', []))} nodes in {graph_time:.2f}s")
+    
+    # Force garbage collection after transformation
+    gc.collect()
+    print("[UPLOAD] Memory cleanup performed after transformation")
+    
+    # If enhanced extraction was used, enrich with OCR data
+    if use_enhanced and 'enhanced_result' in locals():
+        print("Enriching graph with OCR data...")
         
-        # If enhanced extraction was used, enrich with OCR data
-        if use_enhanced and 'enhanced_result' in locals():
-            print("Enriching graph with OCR data...")
+        # Check if we have OCR results to process
+        if enhanced_result.get("ocr_pipeline", {}).get("ready_for_ocr", False):
+            # Get the rendered regions
+            rendered_regions_count = enhanced_result["ocr_pipeline"]["rendered_regions_count"]
             
-            # Check if we have OCR results to process
-            if enhanced_result.get("ocr_pipeline", {}).get("ready_for_ocr", False):
-                # Get the rendered regions
-                rendered_regions_count = enhanced_result["ocr_pipeline"]["rendered_regions_count"]
-                
-                # TODO: In production, this would call the actual OCR processor
-                # For now, create placeholder enrichment data
-                ocr_enrichment_data = {
-                    "ocr_nodes": [],
-                    "validation_relationships": [],
-                    "discovery_relationships": []
-                }
+            # TODO: In production, this would call the actual OCR processor
+            # For now, create placeholder enrichment data
+            ocr_enrichment_data = {
+                "ocr_nodes": [],
+                "validation_relationships": [],
+                "discovery_relationships": []
+            }
+            
+            # Simulate OCR results based on rendered regions
+            if rendered_regions_count > 0:
+                print(f"Processing {rendered_regions_count} rendered regions for OCR...")
                 
-                # Simulate OCR results based on rendered regions
-                if rendered_regions_count > 0:
-                    print(f"Processing {rendered_regions_count} rendered regions for OCR...")
-                    
-                    # In production: 
-                    # ocr_results = process_ocr_pipeline(enhanced_result)
-                    # validation_report = cross_validate_cad_ocr(ocr_results, entities)
-                    # ocr_enrichment_data = get_neo4j_enrichment_data(validation_report)
-                    
-                    # For now, create sample OCR enrichment
-                    gap_data = enhanced_result.get("gap_analysis", {}).get("coverage_data", {})
-                    if gap_data and gap_data.get("suspicious_regions"):
-                        for i, region in enumerate(gap_data["suspicious_regions"][:3]):
-                            ocr_enrichment_data["ocr_nodes"].append({
-                                "text": f"OCR Text {i+1}",
-                                "confidence": 0.85,
-                                "region_id": f"region_{i}",
-                                "region_type": region.get("region_type", "unknown"),
-                                "processing_engine": "placeholder",
-                                "extracted_info": {}
-                            })
+                # In production: 
+                # ocr_results = process_ocr_pipeline(enhanced_result)
+                # validation_report = cross_validate_cad_ocr(ocr_results, entities)
+                # ocr_enrichment_data = get_neo4j_enrichment_data(validation_report)
                 
-                # Enrich graph if we have OCR data
-                if ocr_enrichment_data["ocr_nodes"]:
-                    from graph_loader import enhance_graph_with_ocr
-                    graph_payload = enhance_graph_with_ocr(graph_payload, ocr_enrichment_data)
-                    print(f"Graph enriched with {len(ocr_enrichment_data['ocr_nodes'])} OCR nodes")
-        
-        # Load into Neo4j with retry logic
-        print("[UPLOAD] Loading to Neo4j...")
-        neo4j_start_time = time.time()
-        
-        # Circuit breaker pattern for Neo4j loading
-        max_retries = 3
-        retry_delay = 1
-        
-        for attempt in range(max_retries):
-            try:
-                load_to_neo4j(graph_payload)
-                neo4j_time = time.time() - neo4j_start_time
-                print(f"[UPLOAD] Successfully loaded to Neo4j in {neo4j_time:.2f}s")
-                break
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    print(f"[UPLOAD] Failed to load to Neo4j after {max_retries} attempts: {e}")
-                    raise
-                wait_time = retry_delay * (2 ** attempt)
-                print(f"[UPLOAD] Neo4j load failed (attempt {attempt + 1}/{max_retries}), retrying in {wait_time}s...")
-                time.sleep(wait_time)
-                gc.collect()  # Clean memory before retry
-        
-        # Count entities and graph elements
-        entities_count = len(test_data) if isinstance(test_data, list) else len(test_data.get('entities', []))
-        nodes_count = len(graph_payload.get('nodes', []))
-        relationships_count = len(graph_payload.get('relationships', []))
-        
-        # Check if async OCR processing was requested
-        if use_enhanced and os.getenv("ENABLE_ASYNC_OCR", "false").lower() == "true":
-            # Submit for async OCR processing
-            processor = get_async_processor()
-            job_id = processor.submit_job(file_path, {"priority": "high"})
+                # For now, create sample OCR enrichment
+                gap_data = enhanced_result.get("gap_analysis", {}).get("coverage_data", {})
+                if gap_data and gap_data.get("suspicious_regions"):
+                    for i, region in enumerate(gap_data["suspicious_regions"][:3]):
+                        ocr_enrichment_data["ocr_nodes"].append({
+                            "text": f"OCR Text {i+1}",
+                            "confidence": 0.85,
+                            "region_id": f"region_{i}",
+                            "region_type": region.get("region_type", "unknown"),
+                            "processing_engine": "placeholder",
+                            "extracted_info": {}
+                        })
             
-            return UploadResponse(
-                message=f"File processed successfully. OCR job {job_id} submitted for background processing.",
-                file_path=str(file_path),
-                entities_extracted=entities_count,
-                nodes_created=nodes_count,
-                relationships_created=relationships_count,
-                ocr_job_id=job_id
-            )
+            # Enrich graph if we have OCR data
+            if ocr_enrichment_data["ocr_nodes"]:
+                graph_payload = enhance_graph_with_ocr(graph_payload, ocr_enrichment_data)
+                print(f"Graph enriched with {len(ocr_enrichment_data['ocr_nodes'])} OCR nodes")
+    
+    # Load into Neo4j with retry logic
+    print("[UPLOAD] Loading to Neo4j...")
+    neo4j_start_time = time.time()
+    
+    # Circuit breaker pattern for Neo4j loading
+    max_retries = 3
+    retry_delay = 1
+    
+    for attempt in range(max_retries):
+        try:
+            await asyncio.to_thread(load_to_neo4j, graph_payload)
+            _invalidate_label_stats()
+            neo4j_time = time.time() - neo4j_start_time
+            print(f"[UPLOAD] Successfully loaded to Neo4j in {neo4j_time:.2f}s")
+            break
+        except Exception as e:
+            if attempt == max_retries - 1:
+                print(f"[UPLOAD] Failed to load to Neo4j after {max_retries} attempts: {e}")
+                raise
+            wait_time = retry_delay * (2 ** attempt)
+            print(f"[UPLOAD] Neo4j load failed (attempt {attempt + 1}/{max_retries}), retrying in {wait_time}s...")
+            await asyncio.sleep(wait_time)
+            gc.collect()  # Clean memory before retry
+    
+    # Count graph elements
+    nodes_count = len(graph_payload.get('nodes', []))
+    relationships_count = len(graph_payload.get('relationships', []))
+    
+    # Check if async OCR processing was requested
+    if use_enhanced and os.getenv("ENABLE_ASYNC_OCR", "false").lower() == "true":
+        # Submit for async OCR processing
+        processor = get_async_processor()
+        job_id = processor.submit_job(file_path, {"priority": "high"})
         
         return UploadResponse(
-            message="File processed successfully",
+            message=f"File processed successfully. OCR job {job_id} submitted for background processing.",
             file_path=str(file_path),
             entities_extracted=entities_count,
             nodes_created=nodes_count,
-            relationships_created=relationships_count
+            relationships_created=relationships_count,
+            ocr_job_id=job_id
         )
+    
+    return UploadResponse(
+        message="File processed successfully",
+        file_path=str(file_path),
+        entities_extracted=entities_count,
+        nodes_created=nodes_count,
+        relationships_created=relationships_count
+    )
+
+
+@app.post("/api/upload", response_model=UploadResponse)
+async def upload_file(file: UploadFile = File(...)):
+    """Upload and process a CAD file (DWG/DXF)."""
+    
+    file_path = await _save_upload(file)
+    
+    try:
+        return await _process_upload(file_path)
         
     except Exception as e:
-        import traceback
         print(f"Upload processing error: {str(e)}")
         print(f"Full traceback: {traceback.format_exc()}")
         # Clean up file on error
@@ -574,6 +717,68 @@ async def upload_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
 
+class UploadJobResponse(BaseModel):
+    job_id: str
+    status: str
+    result: Optional[UploadResponse] = None
+    error: Optional[str] = None
+
+
+# Background upload jobs live in this process only; once the table is full the
+# oldest finished jobs are dropped (queued/processing jobs are always kept)
+UPLOAD_JOBS_MAX = 256
+_upload_jobs: "OrderedDict[str, UploadJobResponse]" = OrderedDict()
+_FINISHED_JOB_STATUSES = frozenset(("completed", "failed"))
+
+
+def _evict_finished_upload_jobs() -> None:
+    excess = len(_upload_jobs) - UPLOAD_JOBS_MAX
+    if excess <= 0:
+        return
+    finished = [job_id for job_id, job in _upload_jobs.items() if job.status in _FINISHED_JOB_STATUSES]
+    for job_id in finished[:excess]:
+        del _upload_jobs[job_id]
+
+
+async def _run_upload_job(job: UploadJobResponse, file_path: Path) -> None:
+    job_id = job.job_id
+    job.status = "processing"
+    try:
+        job.result = await _process_upload(file_path)
+        job.status = "completed"
+    except Exception as e:
+        print(f"[UPLOAD] Job {job_id} failed: {str(e)}")
+        print(f"Full traceback: {traceback.format_exc()}")
+        if file_path.exists():
+            file_path.unlink()
+        job.status = "failed"
+        job.error = f"Processing failed: {str(e)}"
+
+
+@app.post("/api/upload/async", response_model=UploadJobResponse, status_code=202)
+async def upload_file_async(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """Accept a CAD file and process it after the response is sent; poll /api/upload/{job_id}."""
+    
+    file_path = await _save_upload(file)
+    
+    job = UploadJobResponse(job_id=uuid.uuid4().hex, status="queued")
+    _upload_jobs[job.job_id] = job
+    _evict_finished_upload_jobs()
+    
+    # The task gets the job itself, so it runs (and reports) even if the entry is evicted
+    background_tasks.add_task(_run_upload_job, job, file_path)
+    return job
+
+
+@app.get("/api/upload/{job_id}", response_model=UploadJobResponse)
+async def get_upload_job(job_id: str):
+    """Status of a background upload started with /api/upload/async."""
+    job = _upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown upload job: {job_id}")
+    return job
+
+
 class QueryRequest(BaseModel):
     question: str
 
@@ -604,78 +809,193 @@ class IntelligentAnalysisResponse(BaseModel):
 OPENAI_SUMMARY_MODEL = "gpt-4o"
 
 
-@app.post("/api/query", response_model=QueryResponse)
-async def run_query(req: QueryRequest):
-    """Endpoint that converts NL question to Cypher, executes, returns results."""
+# Summaries are keyed on the question, the Cypher and a digest of the serialized
+# results, so a cached summary is only reused while the data it describes is
+# unchanged, without keeping the result payloads themselves alive (LRU order)
+SUMMARY_CACHE_SIZE = 256
+_summary_cache: "OrderedDict[Tuple[str, str, bytes], str]" = OrderedDict()
+
+
+def _summary_key(question: str, cypher: str, results: Any) -> Tuple[str, str, bytes]:
+    if orjson is not None:
+        results_bytes = orjson.dumps(results, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        results_bytes = json.dumps(results).encode("utf-8")
+    return question, cypher, hashlib.sha256(results_bytes).digest()
+
+
+def _cache_summary(key: Tuple[str, str, bytes], summary: str) -> None:
+    _summary_cache[key] = summary
+    if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+
+
+def _cached_summary(key: Tuple[str, str, bytes]) -> Optional[str]:
+    summary = _summary_cache.get(key)
+    if summary is not None:
+        _summary_cache.move_to_end(key)
+    return summary
+
+
+def _summary_messages(question: str, cypher: str, results_json: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "role": "system",
+            "content": "You are an assistant that summarises query results for end users.",
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Question: {question}\nCypher: {cypher}\nResults: {results_json}\n"
+                "Provide a concise, human-readable answer."
+            ),
+        },
+    ]
+
+
+async def _summarize_results(question: str, cypher: str, results: Any) -> str:
+    """Ask OpenAI for a human-readable answer summarizing query results."""
+    key = _summary_key(question, cypher, results)
+    summary = _cached_summary(key)
+    if summary is not None:
+        return summary
+
+    response = await _openai.chat.completions.create(
+        model=OPENAI_SUMMARY_MODEL,
+        messages=_summary_messages(question, cypher, _json_dumps_indented(results)),
+        temperature=0.2,
+    )
+    summary = response.choices[0].message.content.strip()
+    _cache_summary(key, summary)
+    return summary
+
+
+async def _stream_summary(question: str, cypher: str, results: Any) -> AsyncIterator[str]:
+    """Yield the OpenAI summary token by token as the model decodes it."""
+    key = _summary_key(question, cypher, results)
+    summary = _cached_summary(key)
+    if summary is not None:
+        yield summary
+        return
+
+    parts: List[str] = []
+    stream = await _openai.chat.completions.create(
+        model=OPENAI_SUMMARY_MODEL,
+        messages=_summary_messages(question, cypher, _json_dumps_indented(results)),
+        temperature=0.2,
+        stream=True,
+    )
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+    # Only a completed stream is cached; an interrupted one would store a truncated summary
+    _cache_summary(key, "".join(parts).strip())
+
 
+def _ndjson_line(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=str) + b"\n"
+    return (json.dumps(value, default=str) + "\n").encode("utf-8")
+
+
+async def _resolve_query(question: str) -> Tuple[str, Optional[str]]:
+    """Route a question; returns (cypher, analysis) where analysis is set for intelligent answers."""
     try:
         # Use smart router to handle intelligent analysis or Cypher queries
-        result = await smart_query_router_async(req.question)
-        
-        # Check if it's an intelligent analysis (contains markdown formatting)
-        if result.startswith('#') or '**' in result or '•' in result:
-            # Return intelligent analysis directly
-            return QueryResponse(
-                cypher="-- Intelligent Analysis --",
-                results=[{"analysis": result}],
-                summary=result  # Use intelligent analysis as summary
-            )
-        else:
-            # It's a Cypher query, continue with execution
-            cypher = result
-            
+        result = await smart_query_router_async(question)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
+    # Check if it's an intelligent analysis (contains markdown formatting)
+    if result.startswith('#') or '**' in result or '•' in result:
+        return "-- Intelligent Analysis --", result
+    # It's a Cypher query, continue with execution
+    return result, None
+
+
+async def _execute_cypher(cypher: str) -> Any:
     try:
-        results = execute_cypher_query(cypher)
+        # Neo4j round-trip in a worker thread: the event loop keeps serving other requests
+        return await asyncio.to_thread(execute_cypher_query, cypher)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"Cypher execution failed: {exc}") from exc
 
+
+@app.post("/api/query", response_model=QueryResponse)
+async def run_query(req: QueryRequest):
+    """Endpoint that converts NL question to Cypher, executes, returns results."""
+
+    cypher, analysis = await _resolve_query(req.question)
+    if analysis is not None:
+        # Return intelligent analysis directly
+        return QueryResponse(
+            cypher=cypher,
+            results=[{"analysis": analysis}],
+            summary=analysis  # Use intelligent analysis as summary
+        )
+
+    results = await _execute_cypher(cypher)
+
     # Optional summary step
     summary: Optional[str] = None
-    if os.getenv("OPENAI_API_KEY"):
+    if _openai is not None:
         try:
-            from openai import OpenAI  # local import to avoid mandatory dependency at runtime
-
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are an assistant that summarises query results for end users.",
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        f"Question: {req.question}\nCypher: {cypher}\nResults: {json.dumps(results, indent=2)}\n"
-                        "Provide a concise, human-readable answer."
-                    ),
-                },
-            ]
-            response = client.chat.completions.create(model=OPENAI_SUMMARY_MODEL, messages=messages, temperature=0.2)
-            summary = response.choices[0].message.content.strip()
+            summary = await _summarize_results(req.question, cypher, results)
         except Exception:  # noqa: BLE001
             summary = None
 
     return QueryResponse(cypher=cypher, results=results, summary=summary)
 
 
+@app.post("/api/query/ndjson")
+async def run_query_ndjson(req: QueryRequest):
+    """Same as /api/query, but as line-delimited JSON with the summary streamed token by token.
+
+    The first line carries ``cypher`` and ``results``; each following line is a
+    ``{"delta": ...}`` fragment of the summary, so clients see the answer as soon as
+    the model produces its first token instead of after the full completion.
+    """
+    cypher, analysis = await _resolve_query(req.question)
+    results = [{"analysis": analysis}] if analysis is not None else await _execute_cypher(cypher)
+
+    async def generate():
+        yield _ndjson_line({"cypher": cypher, "results": results})
+        if analysis is not None:
+            yield _ndjson_line({"delta": analysis})
+            return
+        if _openai is None:
+            return
+        try:
+            async for delta in _stream_summary(req.question, cypher, results):
+                yield _ndjson_line({"delta": delta})
+        except Exception as exc:  # noqa: BLE001
+            yield _ndjson_line({"error": f"Summary failed: {exc}"})
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @app.post("/api/smart-query", response_model=SmartQueryResponse)
 async def smart_query(req: QueryRequest):
     """Advanced query endpoint with semantic understanding and multiple approaches."""
     
+    if semantic_enhancer is None:
+        raise HTTPException(status_code=500, detail="Semantic enhancer not available")
+
     try:
-        from semantic_query_enhancer import semantic_enhancer
-        
-        # Execute smart search
-        smart_results = semantic_enhancer.execute_smart_search(req.question)
+        # Execute smart search (its Neo4j queries run in a worker thread)
+        smart_results = await asyncio.to_thread(semantic_enhancer.execute_smart_search, req.question)
         
         if not smart_results["query_results"]:
             raise HTTPException(status_code=400, detail="No relevant data found for your question")
         
         # Find best result
         primary_result = smart_results["best_match"] or smart_results["query_results"][0]
-        alternative_results = [r for r in smart_results["query_results"] if r != primary_result]
+        # primary_result is one of the query_results entries: compare identity, not dict contents
+        alternative_results = [r for r in smart_results["query_results"] if r is not primary_result]
         
         # Generate smart explanation based on intent and results
         intent = smart_results["interpretation"].get("intent", smart_results["interpretation"].get("detected_intent", "unknown"))
@@ -702,8 +1022,6 @@ async def smart_query(req: QueryRequest):
             explanation=explanation
         )
         
-    except ImportError:
-        raise HTTPException(status_code=500, detail="Semantic enhancer not available")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Smart query failed: {str(e)}")
 
@@ -713,11 +1031,10 @@ async def intelligent_analysis():
     """Dedicated endpoint for comprehensive intelligent project analysis."""
     
     try:
-        import time
+        if IntelligentProjectAnalyzer is None:
+            raise RuntimeError("Intelligent project analyzer not available")
         start_time = time.time()
         
-        from intelligent_project_analyzer import IntelligentProjectAnalyzer
-        
         analyzer = IntelligentProjectAnalyzer()
         analysis = analyzer.analyze_complete_project()
         analyzer.close()
@@ -751,76 +1068,104 @@ async def intelligent_analysis():
         raise HTTPException(status_code=500, detail=f"Intelligent analysis failed: {str(e)}")
 
 
+# Static part of the suggest-questions response, built once at import
+_SUGGESTED_QUESTIONS = [
+    {
+        "category": "Informações do Projeto",
+        "questions": [
+            "Qual o nome do projeto?",
+            "Qual é o código do projeto?",
+            "Que tipo de projeto é este?",
+            "Onde está localizado o projeto?"
+        ]
+    },
+    {
+        "category": "Escala e Medidas",
+        "questions": [
+            "Qual a escala do projeto?",
+            "Qual o tamanho do desenho?",
+            "Quais são as dimensões principais?",
+            "Em que unidade estão as medidas?"
+        ]
+    },
+    {
+        "category": "Elementos Arquitetônicos",
+        "questions": [
+            "Quantas salas tem o projeto?",
+            "Onde estão as paredes?",
+            "Tem escadas no projeto?",
+            "Quais são os espaços principais?"
+        ]
+    },
+    {
+        "category": "Análise de Dados",
+        "questions": [
+            "Que tipos de elementos tem no desenho?",
+            "Quais são as anotações principais?",
+            "Em quantos layers está organizado?",
+            "Que informações técnicas posso encontrar?"
+        ]
+    },
+    {
+        "category": "Análise Visual",
+        "questions": [
+            "Quais cores aparecem nas legendas?",
+            "Que padrões visuais são usados?",
+            "Como são identificados os elementos verdes?",
+            "Quais elementos têm padrão pontilhado?",
+            "Qual o esquema de cores do projeto?"
+        ]
+    }
+]
+
+_SUGGESTION_TIPS = [
+    "Você pode perguntar em português ou inglês",
+    "Não precisa usar termos técnicos - eu entendo linguagem natural",
+    "Posso buscar informações em diferentes locais (anotações, metadados, nomes)",
+    "Se não encontrar algo, tento abordagens alternativas"
+]
+
+# Node counts per label combination come from a full graph scan: reuse them for a
+# while (and drop them when an upload reloads the graph)
+SUGGEST_STATS_TTL_SECONDS = 60
+_suggest_stats: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+
+
+def _label_stats() -> List[Dict[str, Any]]:
+    """Node counts per label combination, re-queried at most every SUGGEST_STATS_TTL_SECONDS."""
+    global _suggest_stats
+    now = time.monotonic()
+    if _suggest_stats is not None and now - _suggest_stats[0] < SUGGEST_STATS_TTL_SECONDS:
+        return _suggest_stats[1]
+
+    if semantic_enhancer is None:
+        raise RuntimeError("Semantic enhancer not available")
+
+    with semantic_enhancer.driver.session() as session:
+        stats = session.run("MATCH (n) RETURN labels(n) AS types, count(n) AS count").data()
+    _suggest_stats = (now, stats)
+    return stats
+
+
+def _invalidate_label_stats() -> None:
+    """Forget cached label stats (the graph was reloaded)."""
+    global _suggest_stats
+    _suggest_stats = None
+
+
 @app.get("/api/suggest-questions")
 async def suggest_questions():
     """Suggest example questions based on available data."""
     
     try:
-        from semantic_query_enhancer import semantic_enhancer
+        # Check what data is available
+        stats = await asyncio.to_thread(_label_stats)
         
-        with semantic_enhancer.driver.session() as session:
-            # Check what data is available
-            stats = session.run("MATCH (n) RETURN labels(n) AS types, count(n) AS count").data()
-            
-            suggestions = {
-                "data_summary": stats,
-                "suggested_questions": [
-                    {
-                        "category": "Informações do Projeto",
-                        "questions": [
-                            "Qual o nome do projeto?",
-                            "Qual é o código do projeto?",
-                            "Que tipo de projeto é este?",
-                            "Onde está localizado o projeto?"
-                        ]
-                    },
-                    {
-                        "category": "Escala e Medidas",
-                        "questions": [
-                            "Qual a escala do projeto?",
-                            "Qual o tamanho do desenho?",
-                            "Quais são as dimensões principais?",
-                            "Em que unidade estão as medidas?"
-                        ]
-                    },
-                    {
-                        "category": "Elementos Arquitetônicos",
-                        "questions": [
-                            "Quantas salas tem o projeto?",
-                            "Onde estão as paredes?",
-                            "Tem escadas no projeto?",
-                            "Quais são os espaços principais?"
-                        ]
-                    },
-                    {
-                        "category": "Análise de Dados",
-                        "questions": [
-                            "Que tipos de elementos tem no desenho?",
-                            "Quais são as anotações principais?",
-                            "Em quantos layers está organizado?",
-                            "Que informações técnicas posso encontrar?"
-                        ]
-                    },
-                    {
-                        "category": "Análise Visual",
-                        "questions": [
-                            "Quais cores aparecem nas legendas?",
-                            "Que padrões visuais são usados?",
-                            "Como são identificados os elementos verdes?",
-                            "Quais elementos têm padrão pontilhado?",
-                            "Qual o esquema de cores do projeto?"
-                        ]
-                    }
-                ],
-                "tips": [
-                    "Você pode perguntar em português ou inglês",
-                    "Não precisa usar termos técnicos - eu entendo linguagem natural",
-                    "Posso buscar informações em diferentes locais (anotações, metadados, nomes)",
-                    "Se não encontrar algo, tento abordagens alternativas"
-                ]
-            }
-            
-            return suggestions
+        return {
+            "data_summary": stats,
+            "suggested_questions": _SUGGESTED_QUESTIONS,
+            "tips": _SUGGESTION_TIPS
+        }
             
     except Exception as e:
         return {
@@ -843,7 +1188,8 @@ async def suggest_questions():
 async def get_graph_stats():
     """Get current graph statistics including node counts and types."""
     try:
-        from semantic_query_enhancer import semantic_enhancer
+        if semantic_enhancer is None:
+            raise RuntimeError("Semantic enhancer not available")
         
         with semantic_enhancer.driver.session() as session:
             # Get total node count
@@ -895,7 +1241,8 @@ async def stream_query(request: QueryRequest):
     
     async def generate_stream():
         try:
-            from semantic_query_enhancer import semantic_enhancer
+            if semantic_enhancer is None:
+                raise RuntimeError("Semantic enhancer not available")
             
             # Send initial status
             yield f"data: {json.dumps({'type': 'status', 'content': 'Processing query...'})}\n\n"
@@ -907,7 +1254,7 @@ async def stream_query(request: QueryRequest):
             yield f"data: {json.dumps({'type': 'query_enhanced', 'content': f'Enhanced query: {enhanced_query}'})}\n\n"
             
             # Execute the query
-            result = semantic_enhancer.execute_smart_search(enhanced_query)
+            result = await asyncio.to_thread(semantic_enhancer.execute_smart_search, enhanced_query)
             
             # Stream the results in chunks
             if result.get("primary_result"):
@@ -1009,7 +1356,8 @@ async def visual_search(query: str, search_type: str = "all"):
     """
     
     try:
-        from semantic_query_enhancer import semantic_enhancer
+        if semantic_enhancer is None:
+            raise RuntimeError("Semantic enhancer not available")
         
         # Create a query based on search type
         enhanced_query = f"{search_type} {query}"
@@ -5,9 +5,11 @@ Will be implemented in Phase 4.
 
 from typing import Any, Dict, List
 
+import functools
 import json
 import os
 import re
+import time
 from dotenv import load_dotenv
 
 # Carregar variáveis de ambiente do diretório pai
@@ -37,10 +39,12 @@ Graph schema (labels and relationships):
 Each node has a unique `uid` property. Additional common properties:
 Building: name
 Floor: name, level
-Space: raw_points (list of points), point_count, layer
+Space: raw_points_xs, raw_points_ys, raw_points_zs (per-axis vertex coordinate lists), point_count, layer
 WallSegment: start_x, start_y, start_z, end_x, end_y, end_z, layer
-Feature: type (CIRCLE/ARC), center_x, center_y, center_z, radius, layer
-Annotation: text, insert_x, insert_y, insert_z, height, layer
+Feature: type (CIRCLE/ARC), center_x, center_y, center_z, radius, layer, copies
+Annotation: text, insert_x, insert_y, insert_z, height, layer, copies
+`copies` is only set when identical stacked entities were merged into one node;
+count entities with sum(coalesce(n.copies, 1)) rather than count(n).
 Metadata: type, dimscale, ltscale, cmlscale, celtscale
     """
 ).strip()
@@ -173,7 +177,8 @@ COMPACT_SCHEMA = """
 (:Floor)-[:HAS_SPACE]->(:Space)
 (:Floor)-[:HAS_WALL]->(:WallSegment)  
 (:Floor)-[:HAS_ANNOTATION]->(a:Annotation)
-Properties: Space.raw_points, WallSegment.start_x/y/z,end_x/y/z, Annotation.text,insert_x/y/z
+Properties: Space.raw_points_xs/ys/zs, WallSegment.start_x/y/z,end_x/y/z, Annotation.text,insert_x/y/z,copies
+Feature/Annotation.copies = merged identical copies (absent = 1): count with sum(coalesce(n.copies, 1))
 """
 
 def smart_query_router(user_question: str) -> str:
@@ -201,6 +206,18 @@ def text_to_cypher(user_question: str, model: str = "gpt-4o") -> str:  # noqa: D
     if not client or not client.api_key:
         raise RuntimeError("OPENAI_API_KEY environment variable not set")
 
+    try:
+        return _translate_to_cypher(user_question, model)
+    except Exception:
+        # All attempts failed, provide fallback (not cached: the next call retries OpenAI)
+        return _generate_fallback_query(user_question)
+
+
+# Translations depend only on the question, model and (static) schema, so
+# repeated questions skip the OpenAI round-trip; failures are never cached
+@functools.lru_cache(maxsize=1024)
+def _translate_to_cypher(user_question: str, model: str) -> str:
+    """Translate a question with OpenAI (3 attempts); raises if every attempt fails."""
     # Use compact prompt to avoid connection issues
     user_content = f"Convert to Cypher: {user_question}\nSchema: {COMPACT_SCHEMA}\nReturn only the Cypher query:"
 
@@ -222,7 +239,6 @@ def text_to_cypher(user_question: str, model: str = "gpt-4o") -> str:  # noqa: D
             # Clean up the response (remove markdown, explanations, etc.)
             if "```" in content:
                 # Extract from code block
-                import re
                 match = re.search(r"```(?:cypher)?\n?(.*?)\n?```", content, re.S)
                 if match:
                     content = match.group(1).strip()
@@ -235,14 +251,11 @@ def text_to_cypher(user_question: str, model: str = "gpt-4o") -> str:  # noqa: D
                 
             return content
             
-        except Exception as e:
+        except Exception:
             if attempt < 2:  # Not the last attempt
-                import time
                 time.sleep(1)  # Brief delay before retry
                 continue
-            else:
-                # Last attempt failed, provide fallback
-                return _generate_fallback_query(user_question)
+            raise
 
 def _generate_fallback_query(user_question: str) -> str:
     """Generate a fallback Cypher query using semantic understanding."""
@@ -307,20 +320,13 @@ def _generate_fallback_query(user_question: str) -> str:
 
 async def smart_query_router_async(user_question: str) -> str:
     """Async version of smart query router"""
-    import concurrent.futures
-    
-    loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        return await loop.run_in_executor(executor, smart_query_router, user_question)
+    # Shared default executor: no thread pool is created and torn down per call
+    return await asyncio.to_thread(smart_query_router, user_question)
 
 
 async def text_to_cypher_async(user_question: str, model: str = "gpt-4o") -> str:  # noqa: D401
     """Async version that runs the sync function in a thread pool."""
-    import concurrent.futures
-    
-    loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        return await loop.run_in_executor(executor, text_to_cypher, user_question, model)
+    return await asyncio.to_thread(text_to_cypher, user_question, model)
 
 
 # ---------------------------------------------------------------------------